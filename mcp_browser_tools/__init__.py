@@ -9,7 +9,7 @@ __version__ = "0.3.1"
 __author__ = "MCP Browser Tools"
 
 # 导出主要接口
-from .server import main, create_server
+from .server import main, create_server, build_server
 from .config import ServerConfig, BrowserConfig, ToolConfig
 from .browser.tools import BrowserTools
 from .transports import TransportMode, create_transport
@@ -17,6 +17,7 @@ from .transports import TransportMode, create_transport
 __all__ = [
     "main",
     "create_server",
+    "build_server",
     "ServerConfig",
     "BrowserConfig",
     "ToolConfig",
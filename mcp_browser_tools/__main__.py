@@ -2,7 +2,6 @@
 MCP Browser Tools 命令行入口点
 """
 
-import asyncio
 import sys
 import argparse
 from typing import Optional
@@ -10,6 +9,7 @@ from typing import Optional
 from .server import main as server_main, create_server
 from .config import ServerConfig
 from .transports import TransportMode, get_available_transports
+from .utils.eventloop import run
 
 
 def parse_args():
@@ -28,11 +28,14 @@ def parse_args():
   # 使用 HTTP Stream 传输模式
   python -m mcp_browser_tools --transport http_stream --host 0.0.0.0 --port 8080
 
+  # 使用 HTTP/2 传输模式（需要安装 hypercorn）
+  python -m mcp_browser_tools --transport http2 --port 8443
+
   # 设置日志级别
   python -m mcp_browser_tools --transport stdio --log-level DEBUG
 
 环境变量:
-  MCP_TRANSPORT_MODE    传输模式 (stdio/sse/http_stream)
+  MCP_TRANSPORT_MODE    传输模式 (stdio/sse/http_stream/http2)
   MCP_HOST              主机地址
   MCP_PORT              端口号
   MCP_LOG_LEVEL         日志级别
@@ -141,7 +144,7 @@ def create_config_from_args(args) -> ServerConfig:
                 "websocket_endpoint": "/ws",
             }
         )
-    elif transport_mode == TransportMode.HTTP_STREAM:
+    elif transport_mode in (TransportMode.HTTP_STREAM, TransportMode.HTTP2):
         config.transport_config.update(
             {
                 "messages_endpoint": "/messages",
@@ -168,16 +171,19 @@ def main():
     # 创建配置
     config = create_config_from_args(args)
 
+    # stdio 模式下 stdout 是 JSON-RPC 通道，提示信息改写到 stderr
+    out = sys.stderr if config.transport_mode == TransportMode.STDIO else sys.stdout
+
     # 输出启动信息
-    print("\n" + "=" * 50)
-    print("MCP Browser Tools 启动中...")
-    print("=" * 50)
-    print(f"版本: {config.server_version}")
-    print(f"传输模式: {config.transport_mode.value}")
-    print(f"主机: {config.transport_config.get('host', '127.0.0.1')}")
-    print(f"端口: {config.transport_config.get('port', 8000)}")
-    print(f"日志级别: {config.log_level}")
-    print("=" * 50)
+    print("\n" + "=" * 50, file=out)
+    print("MCP Browser Tools 启动中...", file=out)
+    print("=" * 50, file=out)
+    print(f"版本: {config.server_version}", file=out)
+    print(f"传输模式: {config.transport_mode.value}", file=out)
+    print(f"主机: {config.transport_config.get('host', '127.0.0.1')}", file=out)
+    print(f"端口: {config.transport_config.get('port', 8000)}", file=out)
+    print(f"日志级别: {config.log_level}", file=out)
+    print("=" * 50, file=out)
 
     # 运行服务器
     try:
@@ -203,9 +209,9 @@ def main():
                 },
             )
 
-        asyncio.run(run_server())
+        run(run_server())
     except KeyboardInterrupt:
-        print("\n\n服务器已停止")
+        print("\n\n服务器已停止", file=out)
         return 0
     except Exception as e:
         print(f"\n❌ 服务器启动失败: {e}", file=sys.stderr)
@@ -0,0 +1,135 @@
+"""
+工具定义
+服务器默认使用的静态工具目录
+"""
+
+from typing import Tuple
+
+from mcp.types import Tool
+
+TOOL_DEFS: Tuple[Tool, ...] = (
+    Tool(
+        name="navigate_to_url",
+        description="导航到指定的URL",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "要访问的URL地址"}
+            },
+            "required": ["url"],
+        },
+    ),
+    Tool(
+        name="get_page_content",
+        description="获取当前页面的HTML内容",
+        inputSchema={"type": "object", "properties": {}, "required": []},
+    ),
+    Tool(
+        name="get_page_title",
+        description="获取当前页面的标题",
+        inputSchema={"type": "object", "properties": {}, "required": []},
+    ),
+    Tool(
+        name="click_element",
+        description="点击页面上的元素",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "selector": {
+                    "type": "string",
+                    "description": "元素选择器（CSS选择器或XPath）",
+                }
+            },
+            "required": ["selector"],
+        },
+    ),
+    Tool(
+        name="fill_input",
+        description="在输入框中填写文本",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "selector": {"type": "string", "description": "输入框选择器"},
+                "text": {"type": "string", "description": "要填入的文本"},
+            },
+            "required": ["selector", "text"],
+        },
+    ),
+    Tool(
+        name="wait_for_element",
+        description="等待元素出现",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "selector": {"type": "string", "description": "元素选择器"},
+                "timeout": {
+                    "type": "number",
+                    "description": "超时时间（秒），默认30秒",
+                    "default": 30,
+                },
+            },
+            "required": ["selector"],
+        },
+    ),
+    Tool(
+        name="take_screenshot",
+        description="截取当前页面屏幕",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "截图保存路径，默认为screenshot.png",
+                    "default": "screenshot.png",
+                }
+            },
+            "required": [],
+        },
+    ),
+    Tool(
+        name="execute_javascript",
+        description="执行JavaScript代码",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "script": {
+                    "type": "string",
+                    "description": "要执行的JavaScript代码",
+                }
+            },
+            "required": ["script"],
+        },
+    ),
+    Tool(
+        name="get_element_text",
+        description="获取元素的文本内容",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "selector": {
+                    "type": "string",
+                    "description": "元素选择器（CSS选择器或XPath）",
+                }
+            },
+            "required": ["selector"],
+        },
+    ),
+    Tool(
+        name="get_element_attribute",
+        description="获取元素的属性值",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "selector": {
+                    "type": "string",
+                    "description": "元素选择器（CSS选择器或XPath）",
+                },
+                "attribute": {
+                    "type": "string",
+                    "description": "要获取的属性名",
+                }
+            },
+            "required": ["selector", "attribute"],
+        },
+    ),
+)
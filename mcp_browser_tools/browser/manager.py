@@ -5,6 +5,7 @@
 
 import asyncio
 import logging
+import time
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 
@@ -84,7 +85,7 @@ class BrowserManager:
             for instance_id, instance in self.instances.items():
                 if instance.config == config:
                     # 更新最后使用时间
-                    instance.last_used_at = asyncio.get_event_loop().time()
+                    instance.last_used_at = time.monotonic()
                     logger.debug(f"重用浏览器实例: {instance_id}")
                     return instance.tools
 
@@ -97,12 +98,13 @@ class BrowserManager:
             tools = BrowserTools(config)
             await tools.start_browser()
 
+            now = time.monotonic()
             instance = BrowserInstance(
                 id=instance_id,
                 tools=tools,
                 config=config,
-                created_at=asyncio.get_event_loop().time(),
-                last_used_at=asyncio.get_event_loop().time()
+                created_at=now,
+                last_used_at=now
             )
 
             self.instances[instance_id] = instance
@@ -120,7 +122,7 @@ class BrowserManager:
         async with self._lock:
             if instance_id in self.instances:
                 instance = self.instances[instance_id]
-                instance.last_used_at = asyncio.get_event_loop().time()
+                instance.last_used_at = time.monotonic()
                 logger.debug(f"释放浏览器实例: {instance_id}")
 
     async def close_browser(self, instance_id: str):
@@ -142,7 +144,7 @@ class BrowserManager:
     async def get_stats(self) -> Dict[str, Any]:
         """获取管理器统计信息"""
         async with self._lock:
-            now = asyncio.get_event_loop().time()
+            now = time.monotonic()
             active_instances = []
             idle_instances = []
 
@@ -196,7 +198,7 @@ class BrowserManager:
                 await asyncio.sleep(60)  # 每分钟检查一次
 
                 async with self._lock:
-                    now = asyncio.get_event_loop().time()
+                    now = time.monotonic()
                     instances_to_remove = []
 
                     for instance_id, instance in self.instances.items():
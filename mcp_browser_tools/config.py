@@ -48,7 +48,7 @@ class ServerConfig:
                 "mcp_sse_endpoint": os.environ.get("MCP_MCP_SSE_ENDPOINT", "/mcp-sse"),
                 "websocket_endpoint": os.environ.get("MCP_WEBSOCKET_ENDPOINT", "/ws"),
             })
-        elif transport_mode == TransportMode.HTTP_STREAM:
+        elif transport_mode in (TransportMode.HTTP_STREAM, TransportMode.HTTP2):
             transport_config.update({
                 "messages_endpoint": os.environ.get("MCP_MESSAGES_ENDPOINT", "/messages"),
                 "max_request_size": int(os.environ.get("MCP_MAX_REQUEST_SIZE", "1048576")),  # 1MB
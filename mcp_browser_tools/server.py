@@ -4,12 +4,12 @@ MCP 服务器主程序
 """
 
 import asyncio
-import json
 import logging
-import time
-from functools import wraps
-from typing import Any, Dict, List, Optional
+import sys
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
+import orjson
 from mcp.server import Server
 from mcp.types import (
     CallToolRequest,
@@ -17,18 +17,60 @@ from mcp.types import (
     ListToolsRequest,
     ListToolsResult,
     TextContent,
-    Tool,
 )
 
+from ._tool_schemas import TOOL_DEFS
 from .browser.tools import BrowserTools
 from .config import ServerConfig, BrowserConfig, ToolConfig
 from .transports import create_transport, TransportMode
+from .utils.eventloop import run
 from .utils.logging import setup_logging, log_performance
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
 
+# 直接绑定 orjson.dumps 省去一层 Python 函数调用，调用处自行解码为文本
+_dumps = orjson.dumps
+
+# 固定结构的响应模板，只需替换其中的值
+_TITLE_TMPL = '{"title":%s}'
+
+
+# 工具目录在进程生命周期内不变，导入时构建一次
+_TOOLS_LIST_RESULT = ListToolsResult(tools=list(TOOL_DEFS))
+
+
+async def _list_tools(request: ListToolsRequest) -> ListToolsResult:
+    """列出所有可用工具"""
+    return _TOOLS_LIST_RESULT
+
+
+def build_server(
+    name: str = "mcp-browser-tools",
+    list_tools_impl: Optional[Callable[[ListToolsRequest], Awaitable[ListToolsResult]]] = None,
+    call_tool_impl: Optional[Callable[[str, Dict[str, Any]], Awaitable[CallToolResult]]] = None,
+) -> Server:
+    """
+    创建注册了指定处理器的 MCP 服务器实例
+
+    不启动浏览器也不修改全局状态，测试可以直接传入模拟处理器构建独立的服务器。
+
+    Args:
+        name: 服务器名称
+        list_tools_impl: tools/list 处理器，默认返回内置的工具目录
+        call_tool_impl: tools/call 处理器，为 None 时不注册
+
+    Returns:
+        Server: MCP 服务器实例
+    """
+    server = Server(name)
+    server.list_tools()(list_tools_impl or _list_tools)
+    if call_tool_impl is not None:
+        server.call_tool()(call_tool_impl)
+    return server
+
+
 def create_server(config: Optional[ServerConfig] = None) -> Server:
     """
     创建 MCP 服务器实例
@@ -42,34 +84,47 @@ def create_server(config: Optional[ServerConfig] = None) -> Server:
     config = config or ServerConfig.default()
 
     # 设置日志
-    setup_logging(level=config.log_level)
-
-    # 创建服务器实例
-    server = Server(config.server_name)
+    # stdio 模式下 stdout 是 JSON-RPC 通道，日志改写到 stderr
+    stdio = config.transport_mode == TransportMode.STDIO
+    setup_logging(level=config.log_level, stream=sys.stderr if stdio else None)
 
     # 创建浏览器工具实例
     browser_config = BrowserConfig.default()
     browser_tools = BrowserTools(browser_config)
 
+    # 浏览器操作运行在独立的事件循环线程中，避免与传输层的编解码争用同一个循环
+    browser_loop = asyncio.new_event_loop()
+    threading.Thread(
+        target=browser_loop.run_forever, name="browser-loop", daemon=True
+    ).start()
+
+    async def _run_in_browser_loop(coro):
+        """在浏览器事件循环中执行协程并等待结果"""
+        future = asyncio.run_coroutine_threadsafe(coro, browser_loop)
+        return await asyncio.wrap_future(future)
+
+    # 工具名 -> 处理器的分发表
+    tool_handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[CallToolResult]]] = {}
+
+    def _register_tool(func):
+        """以函数名为工具名注册处理器"""
+        tool_handlers[func.__name__] = func
+        return func
+
+    # 响应内容由我们自己的可信字典生成，使用 model_construct 跳过 Pydantic 校验
     def _create_tool_response(result: Dict[str, Any]) -> CallToolResult:
         """创建工具响应"""
-        return CallToolResult(
-            content=[
-                TextContent(type="text", text=json.dumps(result, ensure_ascii=False))
-            ]
+        return CallToolResult.model_construct(
+            content=[TextContent.model_construct(type="text", text=_dumps(result).decode("utf-8"))]
         )
 
     def _create_error_response(error: str) -> CallToolResult:
         """创建错误响应"""
-        return CallToolResult(
-            content=[
-                TextContent(
-                    type="text", text=json.dumps({"error": error}, ensure_ascii=False)
-                )
-            ]
+        return CallToolResult.model_construct(
+            content=[TextContent.model_construct(type="text", text=_dumps({"error": error}).decode("utf-8"))]
         )
 
-    @server.call_tool()
+    @_register_tool
     @log_performance
     async def navigate_to_url(arguments: Dict[str, Any]) -> CallToolResult:
         """导航到指定URL"""
@@ -78,35 +133,39 @@ def create_server(config: Optional[ServerConfig] = None) -> Server:
             return _create_error_response("URL参数是必需的")
 
         try:
-            result = await browser_tools.navigate_to_url(url)
+            result = await _run_in_browser_loop(browser_tools.navigate_to_url(url))
             return _create_tool_response(result)
         except Exception as e:
             logger.error(f"导航到URL失败: {e}")
             return _create_error_response(str(e))
 
-    @server.call_tool()
+    @_register_tool
     @log_performance
     async def get_page_content(arguments: Dict[str, Any]) -> CallToolResult:
         """获取页面内容"""
         try:
-            result = await browser_tools.get_page_content()
+            result = await _run_in_browser_loop(browser_tools.get_page_content())
             return _create_tool_response(result)
         except Exception as e:
             logger.error(f"获取页面内容失败: {e}")
             return _create_error_response(str(e))
 
-    @server.call_tool()
+    @_register_tool
     @log_performance
     async def get_page_title(arguments: Dict[str, Any]) -> CallToolResult:
         """获取页面标题"""
         try:
-            title = await browser_tools.get_page_title()
-            return _create_tool_response({"title": title})
+            title = await _run_in_browser_loop(browser_tools.get_page_title())
+            return CallToolResult.model_construct(
+                content=[
+                    TextContent.model_construct(type="text", text=_TITLE_TMPL % _dumps(title).decode("utf-8"))
+                ]
+            )
         except Exception as e:
             logger.error(f"获取页面标题失败: {e}")
             return _create_error_response(str(e))
 
-    @server.call_tool()
+    @_register_tool
     @log_performance
     async def click_element(arguments: Dict[str, Any]) -> CallToolResult:
         """点击页面元素"""
@@ -115,13 +174,13 @@ def create_server(config: Optional[ServerConfig] = None) -> Server:
             return _create_error_response("选择器参数是必需的")
 
         try:
-            result = await browser_tools.click_element(selector)
+            result = await _run_in_browser_loop(browser_tools.click_element(selector))
             return _create_tool_response(result)
         except Exception as e:
             logger.error(f"点击元素失败: {e}")
             return _create_error_response(str(e))
 
-    @server.call_tool()
+    @_register_tool
     @log_performance
     async def fill_input(arguments: Dict[str, Any]) -> CallToolResult:
         """填充输入框"""
@@ -132,13 +191,13 @@ def create_server(config: Optional[ServerConfig] = None) -> Server:
             return _create_error_response("选择器和文本参数都是必需的")
 
         try:
-            result = await browser_tools.fill_input(selector, text)
+            result = await _run_in_browser_loop(browser_tools.fill_input(selector, text))
             return _create_tool_response(result)
         except Exception as e:
             logger.error(f"填充输入框失败: {e}")
             return _create_error_response(str(e))
 
-    @server.call_tool()
+    @_register_tool
     @log_performance
     async def wait_for_element(arguments: Dict[str, Any]) -> CallToolResult:
         """等待元素出现"""
@@ -149,25 +208,25 @@ def create_server(config: Optional[ServerConfig] = None) -> Server:
             return _create_error_response("选择器参数是必需的")
 
         try:
-            result = await browser_tools.wait_for_element(selector, timeout)
+            result = await _run_in_browser_loop(browser_tools.wait_for_element(selector, timeout))
             return _create_tool_response(result)
         except Exception as e:
             logger.error(f"等待元素失败: {e}")
             return _create_error_response(str(e))
 
-    @server.call_tool()
+    @_register_tool
     @log_performance
     async def take_screenshot(arguments: Dict[str, Any]) -> CallToolResult:
         """截取屏幕"""
         path = arguments.get("path", "screenshot.png")
         try:
-            result = await browser_tools.take_screenshot(path)
+            result = await _run_in_browser_loop(browser_tools.take_screenshot(path))
             return _create_tool_response(result)
         except Exception as e:
             logger.error(f"截图失败: {e}")
             return _create_error_response(str(e))
 
-    @server.call_tool()
+    @_register_tool
     @log_performance
     async def execute_javascript(arguments: Dict[str, Any]) -> CallToolResult:
         """执行JavaScript代码"""
@@ -176,13 +235,13 @@ def create_server(config: Optional[ServerConfig] = None) -> Server:
             return _create_error_response("JavaScript脚本参数是必需的")
 
         try:
-            result = await browser_tools.execute_javascript(script)
+            result = await _run_in_browser_loop(browser_tools.execute_javascript(script))
             return _create_tool_response(result)
         except Exception as e:
             logger.error(f"执行JavaScript失败: {e}")
             return _create_error_response(str(e))
 
-    @server.call_tool()
+    @_register_tool
     @log_performance
     async def get_element_text(arguments: Dict[str, Any]) -> CallToolResult:
         """获取元素文本内容"""
@@ -191,13 +250,13 @@ def create_server(config: Optional[ServerConfig] = None) -> Server:
             return _create_error_response("选择器参数是必需的")
 
         try:
-            result = await browser_tools.get_element_text(selector)
+            result = await _run_in_browser_loop(browser_tools.get_element_text(selector))
             return _create_tool_response(result)
         except Exception as e:
             logger.error(f"获取元素文本失败: {e}")
             return _create_error_response(str(e))
 
-    @server.call_tool()
+    @_register_tool
     @log_performance
     async def get_element_attribute(arguments: Dict[str, Any]) -> CallToolResult:
         """获取元素属性"""
@@ -207,145 +266,20 @@ def create_server(config: Optional[ServerConfig] = None) -> Server:
             return _create_error_response("选择器和属性参数都是必需的")
 
         try:
-            result = await browser_tools.get_element_attribute(selector, attribute)
+            result = await _run_in_browser_loop(browser_tools.get_element_attribute(selector, attribute))
             return _create_tool_response(result)
         except Exception as e:
             logger.error(f"获取元素属性失败: {e}")
             return _create_error_response(str(e))
 
-    @server.list_tools()
-    async def list_tools(request: ListToolsRequest) -> ListToolsResult:
-        """列出所有可用工具"""
-        tools = [
-            Tool(
-                name="navigate_to_url",
-                description="导航到指定的URL",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "url": {"type": "string", "description": "要访问的URL地址"}
-                    },
-                    "required": ["url"],
-                },
-            ),
-            Tool(
-                name="get_page_content",
-                description="获取当前页面的HTML内容",
-                inputSchema={"type": "object", "properties": {}, "required": []},
-            ),
-            Tool(
-                name="get_page_title",
-                description="获取当前页面的标题",
-                inputSchema={"type": "object", "properties": {}, "required": []},
-            ),
-            Tool(
-                name="click_element",
-                description="点击页面上的元素",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "selector": {
-                            "type": "string",
-                            "description": "元素选择器（CSS选择器或XPath）",
-                        }
-                    },
-                    "required": ["selector"],
-                },
-            ),
-            Tool(
-                name="fill_input",
-                description="在输入框中填写文本",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "selector": {"type": "string", "description": "输入框选择器"},
-                        "text": {"type": "string", "description": "要填入的文本"},
-                    },
-                    "required": ["selector", "text"],
-                },
-            ),
-            Tool(
-                name="wait_for_element",
-                description="等待元素出现",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "selector": {"type": "string", "description": "元素选择器"},
-                        "timeout": {
-                            "type": "number",
-                            "description": "超时时间（秒），默认30秒",
-                            "default": 30,
-                        },
-                    },
-                    "required": ["selector"],
-                },
-            ),
-            Tool(
-                name="take_screenshot",
-                description="截取当前页面屏幕",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "path": {
-                            "type": "string",
-                            "description": "截图保存路径，默认为screenshot.png",
-                            "default": "screenshot.png",
-                        }
-                    },
-                    "required": [],
-                },
-            ),
-            Tool(
-                name="execute_javascript",
-                description="执行JavaScript代码",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "script": {
-                            "type": "string",
-                            "description": "要执行的JavaScript代码",
-                        }
-                    },
-                    "required": ["script"],
-                },
-            ),
-            Tool(
-                name="get_element_text",
-                description="获取元素的文本内容",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "selector": {
-                            "type": "string",
-                            "description": "元素选择器（CSS选择器或XPath）",
-                        }
-                    },
-                    "required": ["selector"],
-                },
-            ),
-            Tool(
-                name="get_element_attribute",
-                description="获取元素的属性值",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "selector": {
-                            "type": "string",
-                            "description": "元素选择器（CSS选择器或XPath）",
-                        },
-                        "attribute": {
-                            "type": "string",
-                            "description": "要获取的属性名",
-                        }
-                    },
-                    "required": ["selector", "attribute"],
-                },
-            ),
-        ]
-
-        return ListToolsResult(tools=tools)
+    async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
+        """按工具名分发工具调用"""
+        handler = tool_handlers.get(name)
+        if handler is None:
+            return _create_error_response(f"未知的工具: {name}")
+        return await handler(arguments)
 
-    return server
+    return build_server(config.server_name, call_tool_impl=call_tool)
 
 
 async def main():
@@ -353,14 +287,16 @@ async def main():
     # 加载配置
     config = ServerConfig.default()
 
+    out = sys.stderr if config.transport_mode == TransportMode.STDIO else sys.stdout
+
     # 输出启动信息
-    print("\n" + "=" * 50)
-    print("MCP Browser Tools 启动中...")
-    print("=" * 50)
-    print(f"版本: {config.server_version}")
-    print(f"传输模式: {config.transport_mode.value}")
-    print(f"日志级别: {config.log_level}")
-    print("=" * 50)
+    print("\n" + "=" * 50, file=out)
+    print("MCP Browser Tools 启动中...", file=out)
+    print("=" * 50, file=out)
+    print(f"版本: {config.server_version}", file=out)
+    print(f"传输模式: {config.transport_mode.value}", file=out)
+    print(f"日志级别: {config.log_level}", file=out)
+    print("=" * 50, file=out)
 
     # 创建服务器
     server = create_server(config)
@@ -380,13 +316,13 @@ async def main():
             }
         )
     except KeyboardInterrupt:
-        print("\n\n服务器正在停止...")
+        print("\n\n服务器正在停止...", file=out)
         await transport.stop()
-        print("服务器已停止")
+        print("服务器已停止", file=out)
     except Exception as e:
         logger.error(f"服务器运行失败: {e}")
         raise
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run(main())
\ No newline at end of file
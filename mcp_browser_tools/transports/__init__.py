@@ -1,6 +1,6 @@
 """
 传输协议模块
-支持 stdio、SSE 和 Streamable HTTP 传输协议
+支持 stdio、SSE、Streamable HTTP 和 HTTP/2 传输协议
 """
 
 from enum import Enum
@@ -10,6 +10,7 @@ from .base import TransportBase
 from .stdio import StdioTransport
 from .sse import SSETransport
 from .http_stream import HTTPStreamTransport
+from .http2 import HTTP2Transport
 
 
 class TransportMode(str, Enum):
@@ -17,14 +18,18 @@ class TransportMode(str, Enum):
     STDIO = "stdio"
     SSE = "sse"
     HTTP_STREAM = "http_stream"
+    HTTP2 = "http2"
 
 
-TransportClass = Union[Type[StdioTransport], Type[SSETransport], Type[HTTPStreamTransport]]
+TransportClass = Union[
+    Type[StdioTransport], Type[SSETransport], Type[HTTPStreamTransport], Type[HTTP2Transport]
+]
 
 _TRANSPORT_MAP: Dict[TransportMode, TransportClass] = {
     TransportMode.STDIO: StdioTransport,
     TransportMode.SSE: SSETransport,
     TransportMode.HTTP_STREAM: HTTPStreamTransport,
+    TransportMode.HTTP2: HTTP2Transport,
 }
 
 
@@ -65,6 +70,7 @@ __all__ = [
     "StdioTransport",
     "SSETransport",
     "HTTPStreamTransport",
+    "HTTP2Transport",
     "TransportMode",
     "create_transport",
     "get_available_transports",
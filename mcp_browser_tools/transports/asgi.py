@@ -0,0 +1,120 @@
+"""
+ASGI 传输协议基类
+SSE 与 Streamable HTTP 共用的服务器配置、启动和关闭流程
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+
+import uvicorn
+
+from .base import TransportBase
+
+logger = logging.getLogger(__name__)
+
+
+class _UvicornServer(uvicorn.Server):
+    """收到退出信号时先通知流式响应结束，避免 uvicorn 一直等待无尽的响应"""
+
+    def __init__(self, config: uvicorn.Config, on_exit):
+        super().__init__(config)
+        self._on_exit = on_exit
+
+    def handle_exit(self, sig, frame) -> None:
+        self._on_exit()
+        super().handle_exit(sig, frame)
+
+
+class ASGITransport(TransportBase):
+    """在当前事件循环中运行 uvicorn 的传输协议基类"""
+
+    # 日志中使用的传输协议名称
+    _DISPLAY_NAME = "ASGI"
+    _DEFAULT_PORT = 8000
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        super().__init__(config)
+        self._uvicorn: Optional[uvicorn.Server] = None
+
+        self.host = self.config.get("host", "127.0.0.1")
+        self.port = self.config.get("port", self._DEFAULT_PORT)
+        log_level = self.config.get("log_level", "info")
+        self.log_level = log_level.lower() if log_level else "info"
+        # HTTP 解析器，默认使用 httptools 而非纯 Python 的 h11
+        self.http_impl = self.config.get("http", "httptools")
+        # 访问日志每个请求都要写一次，默认关闭；保持连接以复用 TCP 连接
+        self.access_log = self.config.get("access_log", False)
+        self.keep_alive = self.config.get("keep_alive", 75)
+        # 收到退出信号后等待连接结束的最长时间，超时后强制关闭仍在推送的流
+        self.graceful_shutdown = self.config.get("graceful_shutdown", 5)
+
+    def _on_shutdown(self) -> None:
+        """通知仍在推送的流式响应结束（子类重写）"""
+        pass
+
+    def _request_exit(self) -> None:
+        """请求服务器退出"""
+        if self._uvicorn is not None:
+            self._uvicorn.should_exit = True
+
+    async def _serve(self, app, **extra_config) -> None:
+        """
+        在当前事件循环中运行 uvicorn，挂起直到服务器退出
+
+        Args:
+            app: ASGI 应用
+            **extra_config: 额外的 uvicorn.Config 参数
+        """
+        uvicorn_config = uvicorn.Config(
+            app,
+            host=self.host,
+            port=self.port,
+            log_level=self.log_level,
+            http=self.http_impl,
+            access_log=self.access_log,
+            timeout_keep_alive=self.keep_alive,
+            timeout_graceful_shutdown=self.graceful_shutdown,
+            **extra_config
+        )
+        loop = asyncio.get_running_loop()
+        self._uvicorn = _UvicornServer(
+            uvicorn_config,
+            # 信号处理函数中不直接操作事件循环
+            on_exit=lambda: loop.call_soon_threadsafe(self._on_shutdown)
+        )
+        self.server_task = asyncio.create_task(self._uvicorn.serve())
+
+        # 等待服务器启动
+        await self._wait_started()
+
+        self.is_running = True
+        logger.info(f"{self._DISPLAY_NAME} 服务器已启动")
+
+        # 挂起直到服务器退出
+        try:
+            await self.server_task
+        except asyncio.CancelledError:
+            await self.stop()
+
+    async def _wait_started(self, timeout: float = 10.0) -> None:
+        """等待 uvicorn 完成启动"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not self._uvicorn.started:
+            if self.server_task.done():
+                # 启动失败时抛出 uvicorn 的异常
+                self.server_task.result()
+                raise RuntimeError(f"{self._DISPLAY_NAME} 服务器启动失败")
+            if loop.time() > deadline:
+                raise TimeoutError(f"{self._DISPLAY_NAME} 服务器启动超时")
+            await asyncio.sleep(0.05)
+
+    async def stop(self) -> None:
+        """停止传输协议"""
+        self.is_running = False
+        self._on_shutdown()
+        self._request_exit()
+        if self.server_task is not None and self.server_task is not asyncio.current_task():
+            await asyncio.gather(self.server_task, return_exceptions=True)
+        logger.info(f"{self._DISPLAY_NAME} 传输协议已停止")
@@ -4,18 +4,38 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 import asyncio
 import logging
+import time
 
+import orjson
 from mcp.server import Server
+from mcp.types import (
+    CallToolRequest,
+    CallToolRequestParams,
+    ListToolsRequest,
+    PaginatedRequestParams,
+)
 
 logger = logging.getLogger(__name__)
 
+# 结果只取决于参数的只读方法，响应可以缓存并合并并发请求
+_READONLY_METHODS = frozenset({"tools/list", "server/info"})
+_CACHE_TTL = 300.0
+_CACHE_MAX_ENTRIES = 1024
+
 
 class TransportBase(ABC):
     """传输协议基类"""
 
+    # JSON-RPC 方法名 -> 处理方法名，按名称查找以保留子类重写
+    _METHOD_DISPATCH: Dict[str, str] = {
+        "tools/list": "_handle_tools_list",
+        "tools/call": "_handle_tools_call",
+    }
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         初始化传输协议
@@ -27,6 +47,13 @@ class TransportBase(ABC):
         self.is_running = False
         self.server_task: Optional[asyncio.Task] = None
         self.mcp_server: Optional[Server] = None
+        # 只读方法的响应缓存: (方法名, 规范化参数) -> (写入时间, 去掉 id 的响应)
+        self._cache: "OrderedDict[Tuple[str, bytes], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # 正在执行的只读请求，相同请求等待同一个结果
+        self._inflight: Dict[Tuple[str, bytes], asyncio.Future] = {}
+        # 批量请求的最大消息数及每个批量请求内的并发数
+        self.max_batch = self.config.get("max_batch", 100)
+        self.batch_concurrency = self.config.get("batch_concurrency", 16)
 
     @abstractmethod
     async def start(self, server: Server, server_info: Dict[str, Any]) -> None:
@@ -44,7 +71,7 @@ class TransportBase(ABC):
         """停止传输协议"""
         pass
 
-    async def handle_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+    async def handle_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         处理消息（默认实现）
 
@@ -55,79 +82,185 @@ class TransportBase(ABC):
             message: 输入消息
 
         Returns:
-            Dict[str, Any]: 响应消息
+            Optional[Dict[str, Any]]: 响应消息，JSON-RPC 通知（没有 id）返回 None
         """
+        is_notification = "id" not in message
+
         try:
             if self.mcp_server is None:
-                return self._error_response(
+                response = self._error_response(
                     message.get("id"),
                     -32603,
                     "MCP 服务器未初始化"
                 )
-
-            method = message.get("method")
-            params = message.get("params", {})
-
-            if method == "tools/list":
-                return await self._handle_tools_list(message)
-            elif method == "tools/call":
-                return await self._handle_tools_call(message, params)
+            elif message.get("method") in _READONLY_METHODS:
+                response = await self._cached_dispatch(message)
             else:
-                custom_result = await self._handle_custom_method(method or "", params, message)
-                if custom_result is not None:
-                    return custom_result
-                return self._error_response(
-                    message.get("id"),
-                    -32601,
-                    f"未知的 RPC 方法: {method}"
-                )
-
+                response = await self._dispatch(message)
         except Exception as e:
             logger.error(f"处理消息失败: {e}")
-            return self._error_response(
+            response = self._error_response(
                 message.get("id"),
                 -32603,
                 f"内部错误: {str(e)}"
             )
 
-    async def _handle_tools_list(self, message: Dict[str, Any]) -> Dict[str, Any]:
-        """处理 tools/list 方法"""
+        # 按照 JSON-RPC 规范，通知不返回响应
+        return None if is_notification else response
+
+    def _check_batch(self, messages: List[Any]) -> Optional[str]:
+        """
+        检查批量请求的大小
+
+        Returns:
+            Optional[str]: 错误信息，批量请求合法时返回 None
+        """
+        if not messages:
+            return "批量请求不能为空"
+        if len(messages) > self.max_batch:
+            return f"批量请求过大: {len(messages)} > {self.max_batch}"
+        return None
+
+    async def _run_batch(self, messages: List[Any]) -> List[Dict[str, Any]]:
+        """
+        执行 JSON-RPC 批量请求，调用前需先经过 _check_batch 检查
+
+        各条消息以有限并发执行，响应按请求顺序返回，通知不产生响应。
+        """
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def run_one(message: Any) -> Optional[Dict[str, Any]]:
+            if not isinstance(message, dict):
+                return self._error_response(None, -32600, "无效的请求")
+            try:
+                async with semaphore:
+                    return await self.handle_message(message)
+            except Exception as e:
+                logger.error(f"处理批量消息失败: {e}")
+                return self._error_response(message.get("id"), -32603, f"内部错误: {str(e)}")
+
+        results = await asyncio.gather(*(run_one(m) for m in messages))
+        return [r for r in results if r is not None]
+
+    async def _cached_dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        带缓存的只读方法分发
+
+        参数按键排序序列化后作为缓存键，命中且未过期时直接返回缓存的响应；
+        未命中时相同的并发请求只执行一次，其余请求等待同一个结果。
+        """
+        message_id = message.get("id")
+        key = (
+            message["method"],
+            orjson.dumps(message.get("params") or {}, option=orjson.OPT_SORT_KEYS)
+        )
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[0] < _CACHE_TTL:
+                self._cache.move_to_end(key)
+                return {**entry[1], "id": message_id}
+            del self._cache[key]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            # shield 避免某个等待者被取消时连带取消共享的结果
+            response = await asyncio.shield(future)
+            if response is None:
+                # 执行请求的任务被取消，由等待者重新执行
+                return await self._cached_dispatch(message)
+            return {**response, "id": message_id}
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self._dispatch(message)
+        except Exception as e:
+            future.set_exception(e)
+            # 没有等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        except BaseException:
+            # 取消只属于当前任务，不传给其他等待者
+            future.set_result(None)
+            raise
+        finally:
+            del self._inflight[key]
+
+        future.set_result(response)
+        # 错误响应不缓存
+        if "error" not in response:
+            self._cache[key] = (time.monotonic(), {**response, "id": None})
+            if len(self._cache) > _CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+        return response
+
+    async def _dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """按方法名分发消息"""
+        method = message.get("method")
+        params = message.get("params", {})
+
+        handler_name = self._METHOD_DISPATCH.get(method)
+        if handler_name is not None:
+            return await getattr(self, handler_name)(message, params)
+
+        custom_result = await self._handle_custom_method(method or "", params, message)
+        if custom_result is not None:
+            return custom_result
+        return self._error_response(
+            message.get("id"),
+            -32601,
+            f"未知的 RPC 方法: {method}"
+        )
+
+    async def _handle_tools_list(self, message: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        """处理 tools/list 方法，转发给 MCP 服务器注册的工具列表处理器"""
+        handler = self.mcp_server.request_handlers.get(ListToolsRequest)
+        if handler is None:
+            return self._error_response(
+                message.get("id"),
+                -32601,
+                "MCP 服务器未注册工具列表处理器"
+            )
+
+        cursor = params.get("cursor")
+        request = ListToolsRequest(
+            method="tools/list",
+            params=PaginatedRequestParams(cursor=cursor) if cursor is not None else None
+        )
+        result = await handler(request)
+
+        # 响应由 _cached_dispatch 缓存，重复请求不会再次调用处理器和序列化
         return {
             "jsonrpc": "2.0",
             "id": message.get("id"),
-            "result": {
-                "tools": [
-                    {
-                        "name": "navigate_to_url",
-                        "description": "导航到指定URL",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "url": {"type": "string"}
-                            },
-                            "required": ["url"]
-                        }
-                    }
-                ]
-            }
+            "result": orjson.Fragment(result.model_dump_json(by_alias=True, exclude_none=True))
         }
 
     async def _handle_tools_call(self, message: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
-        """处理 tools/call 方法"""
-        tool_name = params.get("name")
-        arguments = params.get("arguments", {})
+        """处理 tools/call 方法，转发给 MCP 服务器注册的工具处理器"""
+        handler = self.mcp_server.request_handlers.get(CallToolRequest)
+        if handler is None:
+            return self._error_response(
+                message.get("id"),
+                -32601,
+                "MCP 服务器未注册工具调用处理器"
+            )
 
+        request = CallToolRequest(
+            method="tools/call",
+            params=CallToolRequestParams(
+                name=params.get("name"),
+                arguments=params.get("arguments", {})
+            )
+        )
+        result = await handler(request)
+
+        # 结果直接由 pydantic 序列化为 JSON，以 Fragment 嵌入响应，不再生成中间字典树
         return {
             "jsonrpc": "2.0",
             "id": message.get("id"),
-            "result": {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"工具 {tool_name} 调用成功，参数: {arguments}"
-                    }
-                ]
-            }
+            "result": orjson.Fragment(result.model_dump_json(by_alias=True, exclude_none=True))
         }
 
     async def _handle_custom_method(self, method: str, params: Dict[str, Any], message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,105 @@
+"""
+HTTP/2 传输协议
+与 Streamable HTTP 使用相同的端点，由 hypercorn 提供 HTTP/2 多路复用
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+
+from .http_stream import HTTPStreamTransport
+
+logger = logging.getLogger(__name__)
+
+
+class HTTP2Transport(HTTPStreamTransport):
+    """HTTP/2 传输协议（需要安装 hypercorn）"""
+
+    _TRANSPORT_NAME = "http2"
+    _DISPLAY_NAME = "HTTP/2"
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        super().__init__(config)
+        # 配置证书时通过 TLS ALPN 协商 h2，否则使用明文 h2c
+        self.certfile = self.config.get("certfile")
+        self.keyfile = self.config.get("keyfile")
+        self._shutdown_event: Optional[asyncio.Event] = None
+
+    async def start(self, server, server_info: Dict[str, Any]) -> None:
+        """启动 HTTP/2 传输"""
+        try:
+            from hypercorn.asyncio import serve
+            from hypercorn.config import Config
+        except ImportError as e:
+            raise ImportError(
+                "HTTP/2 传输需要 hypercorn，请安装: pip install mcp-browser-tools[http2]"
+            ) from e
+
+        logger.info(f"启动 HTTP/2 服务器: {self.host}:{self.port}")
+
+        # 保存 MCP 服务器实例
+        self.mcp_server = server
+
+        scheme = "https" if self.certfile else "http"
+        logger.info("\n".join([
+            "=" * 50,
+            "MCP Browser Tools - HTTP/2 模式",
+            "=" * 50,
+            f"主机: {self.host}",
+            f"端口: {self.port}",
+            "可用端点:",
+            f"  - POST {scheme}://{self.host}:{self.port}/messages (发送消息)",
+            f"  - GET  {scheme}://{self.host}:{self.port}/messages (接收消息流)",
+            f"  - GET  {scheme}://{self.host}:{self.port}/health (健康检查)",
+            f"  - GET  {scheme}://{self.host}:{self.port}/info (服务器信息)",
+            "=" * 50,
+            "按 Ctrl+C 停止服务器",
+        ]))
+
+        hypercorn_config = Config()
+        hypercorn_config.bind = [f"{self.host}:{self.port}"]
+        hypercorn_config.alpn_protocols = ["h2", "http/1.1"]
+        hypercorn_config.keep_alive_timeout = self.keep_alive
+        hypercorn_config.graceful_timeout = self.graceful_shutdown
+        hypercorn_config.loglevel = self.log_level.upper()
+        hypercorn_config.accesslog = "-" if self.access_log else None
+        if self.certfile:
+            hypercorn_config.certfile = self.certfile
+            hypercorn_config.keyfile = self.keyfile
+
+        # 在当前事件循环中运行 hypercorn，stop() 通过事件触发关闭
+        self._shutdown_event = asyncio.Event()
+        self.server_task = asyncio.create_task(
+            serve(self.app, hypercorn_config, shutdown_trigger=self._shutdown_event.wait)
+        )
+
+        self.is_running = True
+        logger.info("HTTP/2 服务器已启动")
+
+        # 挂起直到服务器退出
+        try:
+            await self.server_task
+        except asyncio.CancelledError:
+            await self.stop()
+
+    def _request_exit(self) -> None:
+        """触发 hypercorn 关闭"""
+        if self._shutdown_event is not None:
+            self._shutdown_event.set()
+
+    def get_info(self) -> Dict[str, Any]:
+        """获取传输协议信息"""
+        info = super().get_info()
+        scheme = "https" if self.certfile else "http"
+        info.update({
+            "description": "基于 HTTP/2 多路复用的 MCP Streamable HTTP 传输协议",
+            "protocol": "MCP Streamable HTTP over HTTP/2",
+            "features": ["双向通信", "HTTP/2 多路复用", "流式传输", "NDJSON 格式", "JSON-RPC 批量请求"],
+            "endpoints": [
+                f"{scheme}://{self.host}:{self.port}/messages (POST)",
+                f"{scheme}://{self.host}:{self.port}/messages (GET)",
+                f"{scheme}://{self.host}:{self.port}/health",
+                f"{scheme}://{self.host}:{self.port}/info"
+            ],
+        })
+        return info
@@ -4,21 +4,27 @@ MCP 规范定义的标准传输协议
 """
 
 import asyncio
-import json
 import logging
 import uuid
-from typing import Dict, Any, Optional, AsyncGenerator
+from typing import Dict, Any, List, Optional, AsyncGenerator
 from enum import Enum
 
 from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.responses import StreamingResponse
-import uvicorn
-import threading
+import orjson
 
-from .base import TransportBase
+from .asgi import ASGITransport
 
 logger = logging.getLogger(__name__)
 
+# 心跳行和连接确认行只有时间戳或客户端 ID 会变化，其余部分预先编码
+_HEARTBEAT_PREFIX = b'{"type":"heartbeat","timestamp":'
+_HEARTBEAT_SUFFIX = b'}\n'
+_CONNECTED_TEMPLATE = b'{"type":"connected","client_id":"%b","timestamp":%b}\n'
+
+# 放入订阅队列后使消息流结束
+_SHUTDOWN = object()
+
 
 class HTTPStreamMessageType(str, Enum):
     """HTTP Stream 消息类型"""
@@ -28,21 +34,26 @@ class HTTPStreamMessageType(str, Enum):
     ERROR = "error"
 
 
-class HTTPStreamTransport(TransportBase):
+class HTTPStreamTransport(ASGITransport):
     """Streamable HTTP 传输协议"""
 
+    _DISPLAY_NAME = "HTTP Stream"
+    _DEFAULT_PORT = 8001
+
+    # /health 和 /info 中报告的传输模式名，复用这些路由的子类需要重写
+    _TRANSPORT_NAME = "http_stream"
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__(config)
         self.app = FastAPI(title="MCP Browser Tools HTTP Stream Server")
-        self.server_thread: Optional[threading.Thread] = None
         self.mcp_server = None
-        self.request_queue: asyncio.Queue = asyncio.Queue()
-        self.response_queues: Dict[str, asyncio.Queue] = {}
+        # 每个 GET 消息流一个有界订阅队列，由 notify() 推送服务器通知
+        self._subscribers: List[asyncio.Queue] = []
+        self.active_streams = 0
 
-        self.host = self.config.get("host", "127.0.0.1")
-        self.port = self.config.get("port", 8001)
-        self.log_level = self.config.get("log_level", "info")
         self.max_request_size = self.config.get("max_request_size", 1024 * 1024)
+        self.heartbeat_interval = self.config.get("heartbeat_interval", 15.0)
+        self.queue_max = self.config.get("queue_max", 1024)
 
         # 设置路由
         self._setup_routes()
@@ -64,39 +75,29 @@ class HTTPStreamTransport(TransportBase):
 
                 # 解析 JSON
                 try:
-                    message = json.loads(body.decode("utf-8"))
-                except json.JSONDecodeError as e:
+                    message = orjson.loads(body)
+                except orjson.JSONDecodeError as e:
                     raise HTTPException(status_code=400, detail=f"无效的 JSON: {e}")
 
+                # JSON-RPC 批量请求
+                if isinstance(message, list):
+                    return await self._handle_batch(message)
+
                 # 验证消息格式
                 if not isinstance(message, dict):
-                    raise HTTPException(status_code=400, detail="消息必须是 JSON 对象")
+                    raise HTTPException(status_code=400, detail="消息必须是 JSON 对象或数组")
 
                 # 生成消息 ID
                 message_id = message.get("id") or str(uuid.uuid4())
                 message["id"] = message_id
 
-                # 创建响应队列
-                response_queue: asyncio.Queue = asyncio.Queue()
-                self.response_queues[message_id] = response_queue
-
-                # 将消息放入请求队列
-                await self.request_queue.put((message_id, message))
-
-                # 等待响应
-                try:
-                    response = await asyncio.wait_for(response_queue.get(), timeout=30)
-                    return Response(
-                        content=json.dumps(response, ensure_ascii=False),
-                        media_type="application/json",
-                        status_code=200
-                    )
-                except asyncio.TimeoutError:
-                    raise HTTPException(status_code=504, detail="请求超时")
-                finally:
-                    # 清理响应队列
-                    if message_id in self.response_queues:
-                        del self.response_queues[message_id]
+                # 直接处理消息，无需经过队列中转
+                response = await self.handle_message(message)
+                return Response(
+                    content=orjson.dumps(response),
+                    media_type="application/json",
+                    status_code=200
+                )
 
             except HTTPException:
                 raise
@@ -110,43 +111,70 @@ class HTTPStreamTransport(TransportBase):
             获取服务器消息流
             符合 MCP Streamable HTTP 规范
             """
-            async def message_stream() -> AsyncGenerator[str, None]:
+            async def message_stream() -> AsyncGenerator[bytes, None]:
                 """生成消息流"""
                 client_id = str(uuid.uuid4())
+                loop = asyncio.get_running_loop()
                 logger.info(f"消息流连接建立: {client_id}")
+                queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_max)
+                self._subscribers.append(queue)
+                self.active_streams += 1
 
                 try:
                     # 发送连接确认
-                    yield json.dumps({
-                        "type": "connected",
-                        "client_id": client_id,
-                        "timestamp": asyncio.get_event_loop().time()
-                    }) + "\n"
-
-                    # 处理消息流
-                    while True:
-                        # 从请求队列获取消息
-                        try:
-                            message_id, message = await asyncio.wait_for(
-                                self.request_queue.get(), timeout=1
+                    yield _CONNECTED_TEMPLATE % (
+                        client_id.encode(),
+                        repr(loop.time()).encode()
+                    )
+
+                    # 本连接的 client_id 固定不变，预先编码进消息行前缀
+                    notification_prefix = (
+                        b'{"type":"notification","client_id":"%b","message":' % client_id.encode()
+                    )
+
+                    # 处理消息流：队列读取任务跨轮次保留，空闲时只按心跳间隔唤醒
+                    get_task = None
+                    try:
+                        while True:
+                            if get_task is None:
+                                get_task = asyncio.ensure_future(queue.get())
+                            done, _ = await asyncio.wait(
+                                {get_task}, timeout=self.heartbeat_interval
+                            )
+
+                            if not done:
+                                # 发送心跳
+                                yield (
+                                    _HEARTBEAT_PREFIX
+                                    + repr(loop.time()).encode()
+                                    + _HEARTBEAT_SUFFIX
+                                )
+                                continue
+
+                            item = get_task.result()
+                            get_task = None
+                            if item is _SHUTDOWN:
+                                return
+
+                            # 通知内容已在 notify() 中编码，这里只拼接
+                            yield (
+                                notification_prefix
+                                + item
+                                + b',"timestamp":'
+                                + repr(loop.time()).encode()
+                                + b'}\n'
                             )
-                            yield json.dumps({
-                                "type": "request",
-                                "id": message_id,
-                                "message": message,
-                                "timestamp": asyncio.get_event_loop().time()
-                            }) + "\n"
-                        except asyncio.TimeoutError:
-                            # 发送心跳
-                            yield json.dumps({
-                                "type": "heartbeat",
-                                "timestamp": asyncio.get_event_loop().time()
-                            }) + "\n"
+                    finally:
+                        if get_task is not None:
+                            get_task.cancel()
 
                 except asyncio.CancelledError:
                     logger.info(f"消息流连接结束: {client_id}")
                 except Exception as e:
                     logger.error(f"消息流错误: {e}")
+                finally:
+                    self._subscribers.remove(queue)
+                    self.active_streams -= 1
 
             return StreamingResponse(
                 message_stream(),
@@ -165,8 +193,8 @@ class HTTPStreamTransport(TransportBase):
                 "status": "healthy",
                 "service": "mcp-browser-tools",
                 "version": "0.3.1",
-                "transport": "http_stream",
-                "active_connections": len(self.response_queues)
+                "transport": self._TRANSPORT_NAME,
+                "active_connections": self.active_streams
             }
 
         @self.app.get("/info")
@@ -176,7 +204,7 @@ class HTTPStreamTransport(TransportBase):
                 "name": "mcp-browser-tools",
                 "version": "0.3.1",
                 "protocol": "mcp",
-                "transport": "http_stream",
+                "transport": self._TRANSPORT_NAME,
                 "capabilities": ["tools/list", "tools/call"],
                 "endpoints": {
                     "post_message": f"http://{self.host}:{self.port}/messages",
@@ -185,6 +213,23 @@ class HTTPStreamTransport(TransportBase):
                 }
             }
 
+    async def _handle_batch(self, messages: List[Any]) -> Response:
+        """处理 HTTP 上的 JSON-RPC 批量请求"""
+        error = self._check_batch(messages)
+        if error is not None:
+            raise HTTPException(status_code=413 if messages else 400, detail=error)
+
+        responses = await self._run_batch(messages)
+
+        # 全部是通知时没有响应体
+        if not responses:
+            return Response(status_code=204)
+        return Response(
+            content=orjson.dumps(responses),
+            media_type="application/json",
+            status_code=200
+        )
+
     async def start(self, server, server_info: Dict[str, Any]) -> None:
         """启动 HTTP Stream 传输"""
         logger.info(f"启动 HTTP Stream 服务器: {self.host}:{self.port}")
@@ -193,76 +238,56 @@ class HTTPStreamTransport(TransportBase):
         self.mcp_server = server
 
         # 输出启动信息
-        print("\n" + "=" * 50)
-        print("🚀 MCP Browser Tools - HTTP Stream 模式")
-        print("=" * 50)
-        print(f"📡 主机: {self.host}")
-        print(f"🔌 端口: {self.port}")
-        print("🌐 可用端点:")
-        print(f"  - POST http://{self.host}:{self.port}/messages (发送消息)")
-        print(f"  - GET  http://{self.host}:{self.port}/messages (接收消息流)")
-        print(f"  - GET  http://{self.host}:{self.port}/health (健康检查)")
-        print(f"  - GET  http://{self.host}:{self.port}/info (服务器信息)")
-        print("=" * 50)
-        print("📋 协议: MCP Streamable HTTP")
-        print("📄 媒体类型: application/x-ndjson")
-        print("=" * 50)
-        print("\n按 Ctrl+C 停止服务器\n")
-
-        # 在单独的线程中运行服务器
-        def run_server():
-            uvicorn.run(
-                self.app,
-                host=self.host,
-                port=self.port,
-                log_level=self.log_level,
-                access_log=True
-            )
-
-        self.server_thread = threading.Thread(target=run_server, daemon=True)
-        self.server_thread.start()
-
-        # 等待服务器启动
-        await asyncio.sleep(2)
-
-        self.is_running = True
-        logger.info("HTTP Stream 服务器已启动")
-
-        # 启动消息处理循环
-        asyncio.create_task(self._message_processor())
-
-        # 保持主线程运行
-        try:
-            while self.is_running:
-                await asyncio.sleep(1)
-        except asyncio.CancelledError:
-            await self.stop()
-
-    async def _message_processor(self):
-        """消息处理循环"""
-        while self.is_running:
-            try:
-                # 从请求队列获取消息
-                message_id, message = await asyncio.wait_for(
-                    self.request_queue.get(), timeout=1
-                )
-
-                # 处理消息
-                response = await self.handle_message(message)
-
-                # 将响应放入对应的队列
-                if message_id in self.response_queues:
-                    await self.response_queues[message_id].put(response)
-
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                logger.error(f"消息处理循环错误: {e}")
-
-    async def stop(self) -> None:
-        """停止 HTTP Stream 传输"""
-        self.is_running = False
-        logger.info("HTTP Stream 传输协议已停止")
+        logger.info("\n".join([
+            "=" * 50,
+            "🚀 MCP Browser Tools - HTTP Stream 模式",
+            "=" * 50,
+            f"📡 主机: {self.host}",
+            f"🔌 端口: {self.port}",
+            "🌐 可用端点:",
+            f"  - POST http://{self.host}:{self.port}/messages (发送消息)",
+            f"  - GET  http://{self.host}:{self.port}/messages (接收消息流)",
+            f"  - GET  http://{self.host}:{self.port}/health (健康检查)",
+            f"  - GET  http://{self.host}:{self.port}/info (服务器信息)",
+            "=" * 50,
+            "📋 协议: MCP Streamable HTTP",
+            "📄 媒体类型: application/x-ndjson",
+            "=" * 50,
+            "按 Ctrl+C 停止服务器",
+        ]))
+
+        # 请求头大小上限只对 h11 解析器生效
+        extra_config: Dict[str, Any] = {}
+        if self.http_impl == "h11":
+            extra_config["h11_max_incomplete_event_size"] = self.max_request_size
+
+        await self._serve(self.app, **extra_config)
+
+    def _on_shutdown(self) -> None:
+        """结束所有 GET 消息流"""
+        for queue in self._subscribers:
+            self._offer(queue, _SHUTDOWN)
+
+    def notify(self, message: Dict[str, Any]) -> None:
+        """
+        向所有 GET 消息流推送服务器通知
+
+        消息只编码一次，各订阅队列共享同一份字节；
+        慢速客户端的队列已满时丢弃其最早的通知，不阻塞发送方。
+
+        Args:
+            message: 通知消息
+        """
+        payload = orjson.dumps(message)
+        for queue in self._subscribers:
+            self._offer(queue, payload)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, item: Any) -> None:
+        """非阻塞入队，队列已满时丢弃最早的一条"""
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(item)
 
     async def _handle_custom_method(self, method: str, params: Dict[str, Any], message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """处理 HTTP Stream 特有的方法"""
@@ -286,7 +311,7 @@ class HTTPStreamTransport(TransportBase):
             "port": self.port,
             "description": "MCP Streamable HTTP 传输协议",
             "protocol": "MCP Streamable HTTP",
-            "features": ["双向通信", "HTTP 兼容", "流式传输", "NDJSON 格式"],
+            "features": ["双向通信", "HTTP 兼容", "流式传输", "NDJSON 格式", "HTTP Keep-Alive", "JSON-RPC 批量请求"],
             "endpoints": [
                 f"http://{self.host}:{self.port}/messages (POST)",
                 f"http://{self.host}:{self.port}/messages (GET)",
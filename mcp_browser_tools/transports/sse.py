@@ -4,21 +4,92 @@ SSE (Server-Sent Events) 传输协议
 """
 
 import asyncio
-import json
 import logging
 import uuid
-from typing import Dict, Any, Optional, AsyncGenerator
+from typing import Dict, Any, List, Optional, AsyncGenerator
 from enum import Enum
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
-import uvicorn
-import threading
+import orjson
 
-from .base import TransportBase
+from .asgi import ASGITransport
 
 logger = logging.getLogger(__name__)
 
+# SSE 帧的固定前后缀
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+
+# 只有连接数会变化的静态帧模板
+_SERVER_INFO_FRAME = (
+    _SSE_PREFIX
+    + orjson.dumps({
+        "jsonrpc": "2.0",
+        "method": "server/info",
+        "params": {
+            "name": "mcp-browser-tools",
+            "version": "0.3.1"
+        }
+    })
+    + _SSE_SUFFIX
+)
+_STATUS_TEMPLATE = (
+    b'data: {"jsonrpc":"2.0","method":"server/status",'
+    b'"params":{"status":"running","active_connections":%d}}\n\n'
+)
+
+
+_STREAM_END = object()
+
+
+async def _coalesce_frames(
+    frames: AsyncGenerator[bytes, None],
+    max_frames: int = 32
+) -> AsyncGenerator[bytes, None]:
+    """
+    合并事件流中已就绪的帧，一次写入多条 SSE 记录
+
+    生产者通过有界队列把帧交给消费者，队列满时生产者挂起，形成背压；
+    消费者每次取出当前队列中已有的全部帧（最多 max_frames 条）合并为一次写入，
+    不会为了凑批而额外等待。
+
+    Args:
+        frames: 原始帧生成器
+        max_frames: 单次写入合并的最大帧数
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_frames)
+
+    async def pump():
+        try:
+            async for frame in frames:
+                await queue.put(frame)
+        except Exception as e:
+            logger.error(f"事件流错误: {e}")
+        finally:
+            await frames.aclose()
+        # 被取消时消费者已经退出，不再投递结束标记
+        if not asyncio.current_task().cancelling():
+            await queue.put(_STREAM_END)
+
+    producer = asyncio.create_task(pump())
+    try:
+        while True:
+            frame = await queue.get()
+            if frame is _STREAM_END:
+                return
+            batch = [frame]
+            while len(batch) < max_frames and not queue.empty():
+                frame = queue.get_nowait()
+                if frame is _STREAM_END:
+                    yield b"".join(batch)
+                    return
+                batch.append(frame)
+            yield b"".join(batch)
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
 
 class SSEMessageType(str, Enum):
     """SSE 消息类型"""
@@ -31,19 +102,39 @@ class SSEMessageType(str, Enum):
 class SSEMessage:
     """SSE 消息"""
 
+    # 心跳帧和连接确认帧只有时间戳或客户端 ID 会变化，其余部分预先编码
+    _HEARTBEAT_PREFIX = b'data: {"type":"heartbeat","data":{"timestamp":'
+    _HEARTBEAT_SUFFIX = b'},"id":"heartbeat"}\n\n'
+    _CONNECTED_TEMPLATE = (
+        b'data: {"type":"connected","data":{"client_id":"%b","status":"connected"},'
+        b'"id":"%b"}\n\n'
+    )
+
     def __init__(self, type: SSEMessageType, data: Dict[str, Any], id: Optional[str] = None):
         self.type = type
         self.data = data
         self.id = id or str(uuid.uuid4())
 
-    def to_sse_format(self) -> str:
+    def to_sse_format(self) -> bytes:
         """转换为 SSE 格式"""
         message_data = {
             "type": self.type.value,
             "data": self.data,
             "id": self.id
         }
-        return f"data: {json.dumps(message_data)}\n\n"
+        return _SSE_PREFIX + orjson.dumps(message_data) + _SSE_SUFFIX
+
+    @staticmethod
+    def heartbeat_bytes(ts: float) -> bytes:
+        """生成心跳帧"""
+        return SSEMessage._HEARTBEAT_PREFIX + repr(ts).encode() + SSEMessage._HEARTBEAT_SUFFIX
+
+    @staticmethod
+    def connected_bytes(client_id: str) -> bytes:
+        """生成连接确认帧，client_id 为 UUID 字符串，无需 JSON 转义"""
+        return SSEMessage._CONNECTED_TEMPLATE % (
+            client_id.encode(), str(uuid.uuid4()).encode()
+        )
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "SSEMessage":
@@ -59,58 +150,80 @@ class SSEConnectionManager:
     """SSE 连接管理器"""
 
     def __init__(self):
+        # 所有访问都在同一个事件循环中进行，字典操作之间没有 await，无需加锁
         self.active_connections: Dict[str, WebSocket] = {}
-        self.lock = asyncio.Lock()
+        # 最新的 server/status 帧，仅在连接数变化时重新生成，供所有事件流共享
+        self.status_frame: bytes = _STATUS_TEMPLATE % 0
+
+    def _refresh_status(self):
+        """根据当前连接数刷新状态帧"""
+        self.status_frame = _STATUS_TEMPLATE % len(self.active_connections)
 
     async def connect(self, websocket: WebSocket, client_id: str):
         """建立连接"""
         await websocket.accept()
-        async with self.lock:
-            self.active_connections[client_id] = websocket
+        self.active_connections[client_id] = websocket
+        self._refresh_status()
         logger.info(f"SSE 连接建立: {client_id}")
 
     async def disconnect(self, client_id: str):
         """断开连接"""
-        async with self.lock:
-            if client_id in self.active_connections:
-                del self.active_connections[client_id]
+        self.active_connections.pop(client_id, None)
+        self._refresh_status()
         logger.info(f"SSE 连接断开: {client_id}")
 
     async def send_to_client(self, client_id: str, message: SSEMessage):
         """向特定客户端发送消息"""
-        async with self.lock:
-            if client_id in self.active_connections:
-                try:
-                    await self.active_connections[client_id].send_text(message.to_sse_format())
-                except Exception as e:
-                    logger.error(f"发送消息失败 {client_id}: {e}")
-                    await self.disconnect(client_id)
+        websocket = self.active_connections.get(client_id)
+        if websocket is None:
+            return
+
+        try:
+            await websocket.send_bytes(message.to_sse_format())
+        except Exception as e:
+            logger.error(f"发送消息失败 {client_id}: {e}")
+            await self.disconnect(client_id)
 
     async def broadcast(self, message: SSEMessage):
         """广播消息到所有客户端"""
-        async with self.lock:
-            for client_id, websocket in self.active_connections.items():
-                try:
-                    await websocket.send_text(message.to_sse_format())
-                except Exception as e:
-                    logger.error(f"广播消息失败 {client_id}: {e}")
-                    await self.disconnect(client_id)
+        targets = list(self.active_connections.items())
+
+        payload = message.to_sse_format()
+        results = await asyncio.gather(
+            *(websocket.send_bytes(payload) for _, websocket in targets),
+            return_exceptions=True
+        )
+        dead = []
+        for (client_id, _), result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error(f"广播消息失败 {client_id}: {result}")
+                dead.append(client_id)
 
+        # 统一移除失败的连接，状态帧只刷新一次
+        if dead:
+            for client_id in dead:
+                self.active_connections.pop(client_id, None)
+                logger.info(f"SSE 连接断开: {client_id}")
+            self._refresh_status()
 
-class SSETransport(TransportBase):
+
+class SSETransport(ASGITransport):
     """SSE 传输协议"""
 
+    _DISPLAY_NAME = "SSE"
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__(config)
         self.app = FastAPI(title="MCP Browser Tools SSE Server")
         self.connection_manager = SSEConnectionManager()
-        self.server_thread: Optional[threading.Thread] = None
         self.mcp_server = None
 
-        self.host = self.config.get("host", "127.0.0.1")
-        self.port = self.config.get("port", 8000)
-        log_level = self.config.get("log_level", "info")
-        self.log_level = log_level.lower() if log_level else "info"
+        self.backlog = self.config.get("backlog", 2048)
+        self.limit_concurrency = self.config.get("limit_concurrency", 1000)
+        self.ws_ping_interval = self.config.get("ws_ping_interval", 20.0)
+        self.ws_ping_timeout = self.config.get("ws_ping_timeout", 20.0)
+        # stop() 时置位，事件流生成器随之结束，uvicorn 才能完成关闭
+        self._shutdown_event = asyncio.Event()
 
         # 设置路由
         self._setup_routes()
@@ -121,29 +234,25 @@ class SSETransport(TransportBase):
         @self.app.get("/sse")
         async def sse_endpoint() -> StreamingResponse:
             """SSE 端点"""
-            async def event_generator() -> AsyncGenerator[str, None]:
+            async def event_generator() -> AsyncGenerator[bytes, None]:
                 client_id = str(uuid.uuid4())
+                loop = asyncio.get_running_loop()
 
                 # 发送连接确认
-                yield SSEMessage(
-                    type=SSEMessageType.CONNECTED,
-                    data={"client_id": client_id, "status": "connected"}
-                ).to_sse_format()
+                yield SSEMessage.connected_bytes(client_id)
 
                 # 保持连接活跃
                 try:
                     while True:
                         # 定期发送心跳
-                        yield SSEMessage(
-                            type=SSEMessageType.HEARTBEAT,
-                            data={"timestamp": asyncio.get_event_loop().time()}
-                        ).to_sse_format()
-                        await asyncio.sleep(30)
+                        yield SSEMessage.heartbeat_bytes(loop.time())
+                        if await self._wait_shutdown(30):
+                            return
                 except asyncio.CancelledError:
                     logger.info(f"SSE 连接结束: {client_id}")
 
             return StreamingResponse(
-                event_generator(),
+                _coalesce_frames(event_generator()),
                 media_type="text/event-stream",
                 headers={
                     "Cache-Control": "no-cache",
@@ -155,39 +264,24 @@ class SSETransport(TransportBase):
         @self.app.get("/mcp-sse")
         async def mcp_sse_endpoint() -> StreamingResponse:
             """MCP over SSE 端点"""
-            async def mcp_event_generator() -> AsyncGenerator[str, None]:
+            async def mcp_event_generator() -> AsyncGenerator[bytes, None]:
                 client_id = str(uuid.uuid4())
 
                 # 发送服务器信息
-                server_info = {
-                    "jsonrpc": "2.0",
-                    "method": "server/info",
-                    "params": {
-                        "name": "mcp-browser-tools",
-                        "version": "0.3.1"
-                    }
-                }
-                yield f"data: {json.dumps(server_info)}\n\n"
+                yield _SERVER_INFO_FRAME
 
                 # 处理 MCP 消息流
                 try:
                     while True:
                         # 发送状态更新
-                        status_update = {
-                            "jsonrpc": "2.0",
-                            "method": "server/status",
-                            "params": {
-                                "status": "running",
-                                "active_connections": len(self.connection_manager.active_connections)
-                            }
-                        }
-                        yield f"data: {json.dumps(status_update)}\n\n"
-                        await asyncio.sleep(5)
+                        yield self.connection_manager.status_frame
+                        if await self._wait_shutdown(5):
+                            return
                 except asyncio.CancelledError:
                     logger.info(f"MCP SSE 连接结束: {client_id}")
 
             return StreamingResponse(
-                mcp_event_generator(),
+                _coalesce_frames(mcp_event_generator()),
                 media_type="text/event-stream",
                 headers={
                     "Cache-Control": "no-cache",
@@ -204,15 +298,29 @@ class SSETransport(TransportBase):
 
             try:
                 while True:
-                    # 接收客户端消息
-                    data = await websocket.receive_text()
-                    message = json.loads(data)
-
-                    # 处理消息
-                    response = await self.handle_message(message)
-
-                    # 发送响应
-                    await websocket.send_text(json.dumps(response))
+                    # 接收客户端消息，二进制帧直接交给 orjson 解析，省去 UTF-8 解码
+                    frame = await websocket.receive()
+                    if frame["type"] == "websocket.disconnect":
+                        raise WebSocketDisconnect(frame.get("code", 1000))
+                    raw = frame.get("bytes")
+                    message = orjson.loads(raw if raw is not None else frame["text"])
+
+                    # 处理消息，数组按 JSON-RPC 批量请求并发处理
+                    if isinstance(message, list):
+                        response = await self._handle_ws_batch(message)
+                    else:
+                        response = await self.handle_message(message)
+
+                    # 通知没有响应
+                    if response is None:
+                        continue
+
+                    # 以与请求相同的帧类型发送响应
+                    payload = orjson.dumps(response)
+                    if raw is not None:
+                        await websocket.send_bytes(payload)
+                    else:
+                        await websocket.send_text(payload.decode("utf-8"))
 
             except WebSocketDisconnect:
                 await self.connection_manager.disconnect(client_id)
@@ -220,6 +328,13 @@ class SSETransport(TransportBase):
                 logger.error(f"WebSocket 错误: {e}")
                 await self.connection_manager.disconnect(client_id)
 
+    async def _handle_ws_batch(self, messages: List[Any]) -> Optional[Any]:
+        """处理 WebSocket 上的 JSON-RPC 批量请求，全部是通知时返回 None"""
+        error = self._check_batch(messages)
+        if error is not None:
+            return self._error_response(None, -32600, error)
+        return await self._run_batch(messages) or None
+
     async def start(self, server, server_info: Dict[str, Any]) -> None:
         """启动 SSE 传输"""
         logger.info(f"启动 SSE 服务器: {self.host}:{self.port}")
@@ -228,48 +343,39 @@ class SSETransport(TransportBase):
         self.mcp_server = server
 
         # 输出启动信息
-        print("\n" + "=" * 50)
-        print("MCP Browser Tools - SSE 模式")
-        print("=" * 50)
-        print(f"主机: {self.host}")
-        print(f"端口: {self.port}")
-        print("可用端点:")
-        print(f"  - GET  http://{self.host}:{self.port}/sse")
-        print(f"  - GET  http://{self.host}:{self.port}/mcp-sse")
-        print(f"  - WS   ws://{self.host}:{self.port}/ws")
-        print("=" * 50)
-        print("\n按 Ctrl+C 停止服务器\n")
-
-        # 在单独的线程中运行服务器
-        def run_server():
-            uvicorn.run(
-                self.app,
-                host=self.host,
-                port=self.port,
-                log_level=self.log_level,
-                access_log=True
-            )
-
-        self.server_thread = threading.Thread(target=run_server, daemon=True)
-        self.server_thread.start()
-
-        # 等待服务器启动
-        await asyncio.sleep(2)
-
-        self.is_running = True
-        logger.info("SSE 服务器已启动")
+        logger.info("\n".join([
+            "=" * 50,
+            "MCP Browser Tools - SSE 模式",
+            "=" * 50,
+            f"主机: {self.host}",
+            f"端口: {self.port}",
+            "可用端点:",
+            f"  - GET  http://{self.host}:{self.port}/sse",
+            f"  - GET  http://{self.host}:{self.port}/mcp-sse",
+            f"  - WS   ws://{self.host}:{self.port}/ws",
+            "=" * 50,
+            "按 Ctrl+C 停止服务器",
+        ]))
+
+        await self._serve(
+            self.app,
+            backlog=self.backlog,
+            limit_concurrency=self.limit_concurrency,
+            ws_ping_interval=self.ws_ping_interval,
+            ws_ping_timeout=self.ws_ping_timeout
+        )
 
-        # 保持主线程运行
+    async def _wait_shutdown(self, timeout: float) -> bool:
+        """等待至多 timeout 秒，期间传输被停止则返回 True"""
         try:
-            while self.is_running:
-                await asyncio.sleep(1)
-        except asyncio.CancelledError:
-            await self.stop()
+            await asyncio.wait_for(self._shutdown_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
 
-    async def stop(self) -> None:
-        """停止 SSE 传输"""
-        self.is_running = False
-        logger.info("SSE 传输协议已停止")
+    def _on_shutdown(self) -> None:
+        """结束所有 SSE 事件流"""
+        self._shutdown_event.set()
 
     def get_info(self) -> Dict[str, Any]:
         """获取传输协议信息"""
@@ -278,7 +384,7 @@ class SSETransport(TransportBase):
             "host": self.host,
             "port": self.port,
             "description": "通过 Server-Sent Events 进行通信",
-            "features": ["实时推送", "HTTP 兼容", "WebSocket 支持", "跨域支持"],
+            "features": ["实时推送", "HTTP 兼容", "WebSocket 支持", "跨域支持", "HTTP Keep-Alive"],
             "endpoints": [
                 f"http://{self.host}:{self.port}/sse",
                 f"http://{self.host}:{self.port}/mcp-sse",
@@ -3,9 +3,8 @@ Stdio 传输协议
 通过标准输入输出进行通信
 """
 
-import asyncio
-import json
 import logging
+import sys
 from typing import Dict, Any, Optional
 
 from mcp.server.stdio import stdio_server
@@ -26,17 +25,20 @@ class StdioTransport(TransportBase):
         """启动 stdio 传输"""
         logger.info("启动 stdio 传输协议")
 
-        # 输出启动信息
-        print("\n" + "=" * 50)
-        print("🚀 MCP Browser Tools - Stdio 模式")
-        print("=" * 50)
-        print("📡 通过标准输入输出进行通信")
-        print("📋 支持 JSON-RPC 2.0 协议")
-        print("🛠️  可用工具: navigate_to_url, get_page_content, ...")
-        print("=" * 50)
-        print("\n按 Ctrl+C 停止服务器\n")
+        # 输出启动信息；stdout 是 JSON-RPC 数据通道，横幅只能写到 stderr，
+        # 否则客户端会把它当作一条无法解析的消息
+        sys.stderr.write(
+            "\n" + "=" * 50 + "\n"
+            "🚀 MCP Browser Tools - Stdio 模式\n"
+            + "=" * 50 + "\n"
+            "📡 通过标准输入输出进行通信\n"
+            "📋 支持 JSON-RPC 2.0 协议\n"
+            "🛠️  可用工具: navigate_to_url, get_page_content, ...\n"
+            + "=" * 50 + "\n"
+            "\n按 Ctrl+C 停止服务器\n\n"
+        )
 
-        # 使用 stdio 服务器
+        # 使用 stdio 服务器，逐行的 JSON-RPC 编解码由 MCP 库通过 pydantic-core 完成
         async with stdio_server() as (read_stream, write_stream):
             self.read_stream = read_stream
             self.write_stream = write_stream
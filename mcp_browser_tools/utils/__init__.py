@@ -4,6 +4,7 @@
 
 from .logging import setup_logging, get_logger
 from .validation import validate_url, validate_selector, validate_json_rpc
+from .eventloop import run
 
 __all__ = [
     "setup_logging",
@@ -11,4 +12,5 @@ __all__ = [
     "validate_url",
     "validate_selector",
     "validate_json_rpc",
+    "run",
 ]
\ No newline at end of file
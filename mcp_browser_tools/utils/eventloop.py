@@ -0,0 +1,26 @@
+"""
+事件循环工具
+"""
+
+import asyncio
+from typing import Any, Coroutine
+
+
+def run(main: Coroutine[Any, Any, Any]) -> Any:
+    """
+    运行顶层协程
+
+    安装了 uvloop 时使用 uvloop 事件循环，否则回退到标准库 asyncio。
+
+    Args:
+        main: 要运行的协程
+
+    Returns:
+        Any: 协程的返回值
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main)
+
+    return uvloop.run(main)
@@ -2,16 +2,31 @@
 日志配置工具
 """
 
+import asyncio
+import functools
 import logging
 import sys
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, TextIO
 from pathlib import Path
 
+# 日志级别名称 -> 级别值，避免每次通过 getattr 解析
+_LEVEL_MAP: Dict[str, int] = {
+    name: getattr(logging, name)
+    for name in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+}
+
+
+def _resolve_level(level: str) -> int:
+    """解析日志级别名称，未知名称回退到 INFO"""
+    return _LEVEL_MAP.get(level.upper(), logging.INFO)
+
 
 def setup_logging(
     level: str = "INFO",
     log_file: Optional[str] = None,
     format_str: Optional[str] = None,
+    stream: Optional[TextIO] = None,
     **kwargs
 ) -> None:
     """
@@ -21,25 +36,30 @@ def setup_logging(
         level: 日志级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: 日志文件路径
         format_str: 日志格式字符串
+        stream: 控制台输出流，默认 stdout（stdio 模式需传入 stderr）
         **kwargs: 其他配置参数
     """
     # 默认日志格式
     if format_str is None:
         format_str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
+    level_value = _resolve_level(level)
+
     # 配置根日志记录器
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, level.upper()))
+    root_logger.setLevel(level_value)
 
     # 清除现有的处理器
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
 
+    # 所有处理器共用同一个格式化器
+    formatter = logging.Formatter(format_str)
+
     # 创建控制台处理器
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, level.upper()))
-    console_formatter = logging.Formatter(format_str)
-    console_handler.setFormatter(console_formatter)
+    console_handler = logging.StreamHandler(stream or sys.stdout)
+    console_handler.setLevel(level_value)
+    console_handler.setFormatter(formatter)
     root_logger.addHandler(console_handler)
 
     # 如果需要，创建文件处理器
@@ -47,10 +67,10 @@ def setup_logging(
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
 
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(getattr(logging, level.upper()))
-        file_formatter = logging.Formatter(format_str)
-        file_handler.setFormatter(file_formatter)
+        # 首条记录写入时才打开文件
+        file_handler = logging.FileHandler(log_file, delay=True)
+        file_handler.setLevel(level_value)
+        file_handler.setFormatter(formatter)
         root_logger.addHandler(file_handler)
 
     # 设置特定库的日志级别
@@ -75,7 +95,7 @@ def get_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     logger = logging.getLogger(name)
 
     if level:
-        logger.setLevel(getattr(logging, level.upper()))
+        logger.setLevel(_resolve_level(level))
 
     return logger
 
@@ -85,16 +105,16 @@ class LogContext:
 
     def __init__(self, logger: logging.Logger, level: str = "INFO"):
         self.logger = logger
-        self.level = getattr(logging, level.upper())
+        self.level = _resolve_level(level)
         self.start_time = None
 
     def __enter__(self):
-        self.start_time = logging.time.time()
+        self.start_time = time.perf_counter()
         self.logger.log(self.level, "开始执行")
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        elapsed = logging.time.time() - self.start_time
+        elapsed = time.perf_counter() - self.start_time
         if exc_type is None:
             self.logger.log(self.level, f"执行完成，耗时: {elapsed:.3f}秒")
         else:
@@ -103,42 +123,53 @@ class LogContext:
 
 def log_performance(func):
     """性能监控装饰器"""
-    import time
-    import functools
+    # 函数所属模块和名称固定不变，装饰时获取一次
+    logger = get_logger(func.__module__)
+    name = func.__name__
 
     @functools.wraps(func)
     async def async_wrapper(*args, **kwargs):
-        start_time = time.time()
-        logger = get_logger(func.__module__)
+        # INFO 未启用时跳过计时和消息格式化
+        if not logger.isEnabledFor(logging.INFO):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"{name} 执行失败，错误: {e}")
+                raise
+
+        start_time = time.perf_counter()
         try:
             result = await func(*args, **kwargs)
-            elapsed = time.time() - start_time
-            logger.info(f"{func.__name__} 执行耗时: {elapsed:.3f}秒")
+            elapsed = time.perf_counter() - start_time
+            logger.info(f"{name} 执行耗时: {elapsed:.3f}秒")
             return result
         except Exception as e:
-            elapsed = time.time() - start_time
-            logger.error(f"{func.__name__} 执行失败，耗时: {elapsed:.3f}秒，错误: {e}")
+            elapsed = time.perf_counter() - start_time
+            logger.error(f"{name} 执行失败，耗时: {elapsed:.3f}秒，错误: {e}")
             raise
 
     @functools.wraps(func)
     def sync_wrapper(*args, **kwargs):
-        start_time = time.time()
-        logger = get_logger(func.__module__)
+        # INFO 未启用时跳过计时和消息格式化
+        if not logger.isEnabledFor(logging.INFO):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"{name} 执行失败，错误: {e}")
+                raise
+
+        start_time = time.perf_counter()
         try:
             result = func(*args, **kwargs)
-            elapsed = time.time() - start_time
-            logger.info(f"{func.__name__} 执行耗时: {elapsed:.3f}秒")
+            elapsed = time.perf_counter() - start_time
+            logger.info(f"{name} 执行耗时: {elapsed:.3f}秒")
             return result
         except Exception as e:
-            elapsed = time.time() - start_time
-            logger.error(f"{func.__name__} 执行失败，耗时: {elapsed:.3f}秒，错误: {e}")
+            elapsed = time.perf_counter() - start_time
+            logger.error(f"{name} 执行失败，耗时: {elapsed:.3f}秒，错误: {e}")
             raise
 
     if asyncio.iscoroutinefunction(func):
         return async_wrapper
     else:
         return sync_wrapper
-
-
-# 导入 asyncio 用于检查协程函数
-import asyncio
\ No newline at end of file
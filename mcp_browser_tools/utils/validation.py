@@ -2,12 +2,49 @@
 数据验证工具
 """
 
+import functools
 import re
 import json
-from typing import Dict, Any, Optional, Tuple, List, Callable
-from urllib.parse import urlparse
-
-
+import socket
+from typing import Dict, Any, Optional, Tuple, Callable
+
+# 校验用的正则在导入时编译一次
+_CSS_SELECTOR_PATTERNS = (
+    r"^[a-zA-Z][a-zA-Z0-9_-]*$",  # 元素选择器
+    r"^\.[a-zA-Z][a-zA-Z0-9_-]*$",  # 类选择器
+    r"^#[a-zA-Z][a-zA-Z0-9_-]*$",  # ID选择器
+    r"^\[[a-zA-Z][a-zA-Z0-9_-]*(?:[~|^$*]?=.*?)?\]$",  # 属性选择器
+    r"^[a-zA-Z*][a-zA-Z0-9_-]*\s+[a-zA-Z*][a-zA-Z0-9_-]*$",  # 后代选择器
+)
+# 合并为一个分支正则，一次匹配完成所有模式的判断
+_CSS_SELECTOR_RE = re.compile("|".join(f"(?:{p})" for p in _CSS_SELECTOR_PATTERNS))
+_IP_RE = re.compile(r'^(\d{1,3}\.){3}\d{1,3}$')
+_HOSTNAME_RE = re.compile(
+    r'[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*'
+)
+_URL_SCHEMES = frozenset({"http", "https"})
+_LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1", "0.0.0.0"})
+# 控制字符 (0x00-0x1F, 0x7F) 的删除表，供 str.translate 使用
+_CONTROL_CHARS_TABLE = dict.fromkeys([*range(0x20), 0x7F])
+# 只缓存不超过该长度的字符串，避免超长输入长期占用缓存内存
+_MEMO_MAX_LEN = 2048
+
+
+def _memoize_str(func: Callable[[Any], Tuple[bool, Optional[str]]]) -> Callable[[Any], Tuple[bool, Optional[str]]]:
+    """不超长的字符串参数的校验结果走 LRU 缓存，其他输入直接调用原函数"""
+    cached = functools.lru_cache(maxsize=512)(func)
+
+    @functools.wraps(func)
+    def wrapper(value: Any) -> Tuple[bool, Optional[str]]:
+        if type(value) is str and len(value) <= _MEMO_MAX_LEN:
+            return cached(value)
+        return func(value)
+
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
+@_memoize_str
 def validate_url(url: str) -> Tuple[bool, Optional[str]]:
     """
     验证URL格式
@@ -22,12 +59,15 @@ def validate_url(url: str) -> Tuple[bool, Optional[str]]:
         return False, "URL不能为空"
 
     try:
-        result = urlparse(url)
-        if not all([result.scheme, result.netloc]):
+        # 只需要协议和域名，直接按分隔符切分，不做完整的 URL 解析
+        scheme, sep, rest = url.partition("://")
+        for delimiter in "/?#":
+            rest = rest.partition(delimiter)[0]
+        if not sep or not scheme or not rest:
             return False, "URL格式无效，必须包含协议和域名"
 
         # 检查协议
-        if result.scheme not in ["http", "https"]:
+        if scheme.lower() not in _URL_SCHEMES:
             return False, "URL协议必须是 http 或 https"
 
         return True, None
@@ -35,6 +75,7 @@ def validate_url(url: str) -> Tuple[bool, Optional[str]]:
         return False, f"URL解析失败: {str(e)}"
 
 
+@_memoize_str
 def validate_selector(selector: str) -> Tuple[bool, Optional[str]]:
     """
     验证CSS选择器格式
@@ -52,24 +93,15 @@ def validate_selector(selector: str) -> Tuple[bool, Optional[str]]:
     if len(selector) > 1000:
         return False, "选择器过长"
 
-    # 检查常见的选择器模式
-    css_patterns = [
-        r"^[a-zA-Z][a-zA-Z0-9_-]*$",  # 元素选择器
-        r"^\.[a-zA-Z][a-zA-Z0-9_-]*$",  # 类选择器
-        r"^#[a-zA-Z][a-zA-Z0-9_-]*$",  # ID选择器
-        r"^\[[a-zA-Z][a-zA-Z0-9_-]*(?:[~|^$*]?=.*?)?\]$",  # 属性选择器
-        r"^[a-zA-Z*][a-zA-Z0-9_-]*\s+[a-zA-Z*][a-zA-Z0-9_-]*$",  # 后代选择器
-    ]
-
-    for pattern in css_patterns:
-        if re.match(pattern, selector):
+    # XPath 只需检查前缀，无需运行正则
+    if selector.startswith(("//", ".//")):
+        if len(selector) < 500:
             return True, None
+        return False, "选择器格式无效"
 
-    # 如果不是标准CSS选择器，可能是XPath
-    if selector.startswith("//") or selector.startswith(".//"):
-        # 简单的XPath验证
-        if "//" in selector and len(selector) < 500:
-            return True, None
+    # 检查常见的选择器模式
+    if _CSS_SELECTOR_RE.match(selector):
+        return True, None
 
     return False, "选择器格式无效"
 
@@ -111,6 +143,105 @@ def validate_json_rpc(message: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
     return True, None
 
 
+def _nonempty_str_validator(name: str) -> Callable[[Any], Tuple[bool, str]]:
+    """生成非空字符串参数的验证器"""
+    error_msg = f"{name}不能为空且必须是字符串"
+
+    def validator(value: Any) -> Tuple[bool, str]:
+        return bool(value and isinstance(value, str)), error_msg
+
+    return validator
+
+
+_validate_text = _nonempty_str_validator("text")
+_validate_script = _nonempty_str_validator("script")
+_validate_attribute = _nonempty_str_validator("attribute")
+
+
+def _validate_positive_number(value: Any) -> Tuple[bool, str]:
+    """验证正数参数"""
+    return isinstance(value, (int, float)) and value > 0, "timeout必须是正数"
+
+
+def _validate_path_str(value: Any) -> Tuple[bool, str]:
+    """验证路径参数"""
+    return isinstance(value, str) and len(value) < 500, "path必须是字符串且长度小于500"
+
+
+# 各工具的参数验证规则，导入时构建一次
+_VALIDATION_RULES: Dict[str, Dict[str, Any]] = {
+    "navigate_to_url": {
+        "required": ["url"],
+        "optional": [],
+        "validators": {
+            "url": validate_url
+        }
+    },
+    "click_element": {
+        "required": ["selector"],
+        "optional": [],
+        "validators": {
+            "selector": validate_selector
+        }
+    },
+    "fill_input": {
+        "required": ["selector", "text"],
+        "optional": [],
+        "validators": {
+            "selector": validate_selector,
+            "text": _validate_text
+        }
+    },
+    "wait_for_element": {
+        "required": ["selector"],
+        "optional": ["timeout"],
+        "validators": {
+            "selector": validate_selector,
+            "timeout": _validate_positive_number
+        }
+    },
+    "execute_javascript": {
+        "required": ["script"],
+        "optional": [],
+        "validators": {
+            "script": _validate_script
+        }
+    },
+    "take_screenshot": {
+        "required": [],
+        "optional": ["path"],
+        "validators": {
+            "path": _validate_path_str
+        }
+    },
+    "get_element_text": {
+        "required": ["selector"],
+        "optional": [],
+        "validators": {
+            "selector": validate_selector
+        }
+    },
+    "get_element_attribute": {
+        "required": ["selector", "attribute"],
+        "optional": [],
+        "validators": {
+            "selector": validate_selector,
+            "attribute": _validate_attribute
+        }
+    }
+}
+
+# 各工具的必需参数集合，用一次集合差运算找出缺失参数
+_REQUIRED: Dict[str, frozenset] = {
+    name: frozenset(rules["required"]) for name, rules in _VALIDATION_RULES.items()
+}
+
+# 各工具的 (参数名, 验证器) 元组，按声明顺序校验
+_VALIDATORS: Dict[str, Tuple[Tuple[str, Callable], ...]] = {
+    name: tuple(rules["validators"].items()) for name, rules in _VALIDATION_RULES.items()
+}
+
+
 def validate_tool_arguments(tool_name: str, arguments: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
     """
     验证工具参数
@@ -125,84 +256,43 @@ def validate_tool_arguments(tool_name: str, arguments: Dict[str, Any]) -> Tuple[
     if not isinstance(arguments, dict):
         return False, "参数必须是字典"
 
-    # 根据工具名称验证参数
-    validation_rules = {
-        "navigate_to_url": {
-            "required": ["url"],
-            "optional": [],
-            "validators": {
-                "url": validate_url
-            }
-        },
-        "click_element": {
-            "required": ["selector"],
-            "optional": [],
-            "validators": {
-                "selector": validate_selector
-            }
-        },
-        "fill_input": {
-            "required": ["selector", "text"],
-            "optional": [],
-            "validators": {
-                "selector": validate_selector,
-                "text": lambda x: (bool(x and isinstance(x, str)), "text不能为空且必须是字符串")
-            }
-        },
-        "wait_for_element": {
-            "required": ["selector"],
-            "optional": ["timeout"],
-            "validators": {
-                "selector": validate_selector,
-                "timeout": lambda x: (isinstance(x, (int, float)) and x > 0, "timeout必须是正数")
-            }
-        },
-        "execute_javascript": {
-            "required": ["script"],
-            "optional": [],
-            "validators": {
-                "script": lambda x: (bool(x and isinstance(x, str)), "script不能为空且必须是字符串")
-            }
-        },
-        "take_screenshot": {
-            "required": [],
-            "optional": ["path"],
-            "validators": {
-                "path": lambda x: (isinstance(x, str) and len(x) < 500, "path必须是字符串且长度小于500")
-            }
-        },
-        "get_element_text": {
-            "required": ["selector"],
-            "optional": [],
-            "validators": {
-                "selector": validate_selector
-            }
-        },
-        "get_element_attribute": {
-            "required": ["selector", "attribute"],
-            "optional": [],
-            "validators": {
-                "selector": validate_selector,
-                "attribute": lambda x: (bool(x and isinstance(x, str)), "attribute不能为空且必须是字符串")
-            }
-        }
-    }
-
-    if tool_name not in validation_rules:
+    # 无参数调用只需看该工具有没有必需参数
+    if not arguments:
+        if _REQUIRED.get(tool_name):
+            return False, f"缺少必需参数: {_VALIDATION_RULES[tool_name]['required'][0]}"
         return True, None
 
-    rules: Dict[str, Any] = validation_rules[tool_name]
+    # 参数值都可哈希时按 (工具名, 参数) 缓存校验结果
+    try:
+        frozen_args = frozenset(arguments.items())
+    except TypeError:
+        return _check_tool_arguments(tool_name, arguments)
+    return _check_tool_arguments_cached(tool_name, frozen_args)
+
+
+@functools.lru_cache(maxsize=512)
+def _check_tool_arguments_cached(
+    tool_name: str, frozen_args: frozenset
+) -> Tuple[bool, Optional[str]]:
+    """带缓存的工具参数校验"""
+    return _check_tool_arguments(tool_name, dict(frozen_args))
 
-    required_params: List[str] = rules["required"]
-    for required_param in required_params:
-        if required_param not in arguments:
-            return False, f"缺少必需参数: {required_param}"
 
-    validators: Optional[Dict[str, Callable]] = rules.get("validators")
-    for param_name, param_value in arguments.items():
-        if validators and param_name in validators:
-            validator = validators[param_name]
-            is_valid, error_msg = validator(param_value)
+def _check_tool_arguments(tool_name: str, arguments: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    """按规则校验工具参数"""
+    rules = _VALIDATION_RULES.get(tool_name)
+    if rules is None:
+        return True, None
+
+    missing = _REQUIRED[tool_name].difference(arguments)
+    if missing:
+        # 按声明顺序报告第一个缺失的参数
+        required_param = next(p for p in rules["required"] if p in missing)
+        return False, f"缺少必需参数: {required_param}"
+
+    for param_name, validator in _VALIDATORS[tool_name]:
+        if param_name in arguments:
+            is_valid, error_msg = validator(arguments[param_name])
             if not is_valid:
                 return False, f"参数 {param_name} 无效: {error_msg}"
 
@@ -223,14 +313,8 @@ def sanitize_input(input_str: str, max_length: int = 1000) -> str:
     if not isinstance(input_str, str):
         return ""
 
-    # 移除控制字符
-    cleaned = re.sub(r'[\x00-\x1F\x7F]', '', input_str)
-
-    # 截断长度
-    if len(cleaned) > max_length:
-        cleaned = cleaned[:max_length]
-
-    return cleaned.strip()
+    # 移除控制字符后再限制长度
+    return input_str.translate(_CONTROL_CHARS_TABLE)[:max_length].strip()
 
 
 def validate_port(port: int) -> Tuple[bool, Optional[str]]:
@@ -265,20 +349,25 @@ def validate_host(host: str) -> Tuple[bool, Optional[str]]:
     if not host:
         return False, "主机地址不能为空"
 
-    # 检查是否是有效的IP地址或主机名
-    ip_pattern = r'^(\d{1,3}\.){3}\d{1,3}$'
-    hostname_pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*$'
-
-    if re.match(ip_pattern, host):
-        # 验证IP地址的每个部分
-        parts = host.split('.')
-        for part in parts:
-            if int(part) > 255:
-                return False, "IP地址无效"
+    if host in _LOCAL_HOSTS:
         return True, None
-    elif re.match(hostname_pattern, host):
-        return True, None
-    elif host in ["localhost", "127.0.0.1", "0.0.0.0"]:
+
+    # 只有形如点分四段数字的地址才需要按 IP 校验，普通主机名直接跳过
+    if host.count('.') == 3 and host.replace('.', '').isdigit():
+        # inet_pton 一次完成格式和范围校验
+        try:
+            socket.inet_pton(socket.AF_INET, host)
+            return True, None
+        except OSError:
+            pass
+
+        # inet_pton 不接受的写法：带前导零的仍按原规则放行，其余为某段超出范围
+        if _IP_RE.match(host):
+            if all(int(part) <= 255 for part in host.split('.')):
+                return True, None
+            return False, "IP地址无效"
+
+    # fullmatch 不会像 $ 那样接受结尾的换行符
+    if _HOSTNAME_RE.fullmatch(host):
         return True, None
-    else:
-        return False, "主机地址格式无效"
\ No newline at end of file
+    return False, "主机地址格式无效"
@@ -14,23 +14,22 @@ async def run_sse_server():
     print("启动 MCP Browser Tools (SSE 模式)...")
 
     from mcp_browser_tools.config import ServerConfig
-    from mcp_browser_tools.transport import create_transport
-    from mcp.server import Server
+    from mcp_browser_tools.server import create_server
+    from mcp_browser_tools.transports import TransportMode, create_transport
 
     # 创建 SSE 配置
     config = ServerConfig(
-        transport_mode="sse",
-        sse_host="localhost",
-        sse_port=8000
+        transport_mode=TransportMode.SSE,
+        transport_config={"host": "localhost", "port": 8000}
     )
 
     # 创建传输层
-    transport = create_transport(config)
+    transport = create_transport(config.transport_mode, **config.get_transport_config())
 
     # 创建 MCP 服务器
-    server = Server(config.server_name)
+    server = create_server(config)
 
-    print(f"SSE 服务器地址: http://{config.sse_host}:{config.sse_port}")
+    print(f"SSE 服务器地址: http://{transport.host}:{transport.port}")
     print("可用端点:")
     print("  - GET /sse      : 简单的 SSE 事件流")
     print("  - GET /mcp-sse  : MCP over SSE 端点")
@@ -39,7 +38,7 @@ async def run_sse_server():
 
     try:
         # 启动服务器
-        await transport.run(
+        await transport.start(
             server,
             {
                 "server_name": config.server_name,
@@ -51,37 +50,46 @@ async def run_sse_server():
         await transport.stop()
         print("服务器已停止")
 
-async def test_sse_client():
-    """测试 SSE 客户端连接"""
+async def test_sse_client(session=None):
+    """
+    测试 SSE 客户端连接
+
+    Args:
+        session: 可复用的 aiohttp.ClientSession，未提供时临时创建
+    """
     print("\n测试 SSE 客户端连接...")
 
     import aiohttp
-    import json
+
+    from sse_client_example import iter_sse_events
+
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession()
 
     try:
-        async with aiohttp.ClientSession() as session:
-            # 连接到 SSE 端点
-            print("连接到 SSE 端点...")
-            async with session.get("http://localhost:8000/sse") as response:
-                if response.status == 200:
-                    print("连接成功，等待事件...")
-
-                    # 读取前几个事件
-                    event_count = 0
-                    async for line in response.content:
-                        line = line.decode('utf-8').strip()
-                        if line.startswith("data: "):
-                            data = json.loads(line[6:])
-                            print(f"事件 {event_count + 1}: {data}")
-                            event_count += 1
-
-                            if event_count >= 3:
-                                break
-                else:
-                    print(f"连接失败: HTTP {response.status}")
+        # 连接到 SSE 端点
+        print("连接到 SSE 端点...")
+        async with session.get("http://localhost:8000/sse") as response:
+            if response.status == 200:
+                print("连接成功，等待事件...")
+
+                # 读取前几个事件
+                event_count = 0
+                async for data in iter_sse_events(response):
+                    print(f"事件 {event_count + 1}: {data}")
+                    event_count += 1
+
+                    if event_count >= 3:
+                        break
+            else:
+                print(f"连接失败: HTTP {response.status}")
 
     except Exception as e:
         print(f"客户端测试失败: {e}")
+    finally:
+        if own_session:
+            await session.close()
 
 async def main():
     """主函数"""
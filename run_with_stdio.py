@@ -17,17 +17,17 @@ async def main():
     os.environ["MCP_TRANSPORT_MODE"] = "stdio"
 
     from mcp_browser_tools.config import ServerConfig
-    from mcp_browser_tools.transport import create_transport
-    from mcp.server import Server
+    from mcp_browser_tools.server import create_server
+    from mcp_browser_tools.transports import create_transport
 
     # 创建配置
     config = ServerConfig.default()
 
     # 创建传输层
-    transport = create_transport(config)
+    transport = create_transport(config.transport_mode, **config.get_transport_config())
 
     # 创建 MCP 服务器
-    server = Server(config.server_name)
+    server = create_server(config)
 
     print("使用 stdio 传输模式")
     print("通过标准输入输出进行通信")
@@ -35,7 +35,7 @@ async def main():
 
     try:
         # 启动服务器
-        await transport.run(
+        await transport.start(
             server,
             {
                 "server_name": config.server_name,
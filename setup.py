@@ -4,6 +4,7 @@ Setup configuration for PyPI publishing
 
 from setuptools import setup, find_packages
 import os
+import tomllib
 
 # 读取 README.md
 readme_path = os.path.join(os.path.dirname(__file__), "README.md")
@@ -16,21 +17,13 @@ else:
 
 # 读取 pyproject.toml 的依赖
 def get_dependencies():
-    with open("pyproject.toml", "r", encoding="utf-8") as f:
-        content = f.read()
-
-    import re
-
-    # 简单提取依赖，实际项目中建议使用 toml 库
-    deps_match = re.search(r"dependencies\s*=\s*\[(.*?)\]", content, re.DOTALL)
-    if deps_match:
-        deps = []
-        for line in deps_match.group(1).split("\n"):
-            line = line.strip().strip('"').strip("'")
-            if line and not line.startswith("#"):
-                deps.append(line)
-        return deps
-    return []
+    pyproject_path = os.path.join(os.path.dirname(__file__), "pyproject.toml")
+    try:
+        with open(pyproject_path, "rb") as f:
+            data = tomllib.load(f)
+    except FileNotFoundError:
+        return []
+    return data.get("project", {}).get("dependencies", [])
 
 
 setup(
@@ -4,59 +4,302 @@ MCP SSE 客户端示例
 """
 
 import asyncio
-import json
+import itertools
 import aiohttp
-from typing import AsyncGenerator, Dict, Any
+import anyio
+import orjson
+from typing import AsyncGenerator, Dict, Any, Optional
+
+_DATA_PREFIX = b"data:"
+_DATA_PREFIX_LEN = len(_DATA_PREFIX)
+
+# 放入事件队列后使 listen_events 退出
+_SENTINEL = object()
+
+# 单个 JSON-RPC 批量帧最多合并的请求数
+_MAX_BATCH = 64
+
+# 预编码的 JSON-RPC 请求骨架，每次调用只拼接名称、参数和 id
+_TOOLS_CALL_PREFIX = b'{"jsonrpc":"2.0","method":"tools/call","params":{"name":'
+_TOOLS_CALL_ARGUMENTS = b',"arguments":'
+_TOOLS_LIST_BODY = b'{"jsonrpc":"2.0","method":"tools/list"'
+_EMPTY_OBJECT = b"{}"
+
+# 进程内共享的会话，复用连接池、DNS 缓存和 keep-alive 连接
+_SESSION: Optional[aiohttp.ClientSession] = None
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """获取共享的 ClientSession，首次使用时创建"""
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        _SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=30)
+        )
+    return _SESSION
+
+
+async def _close_session():
+    """关闭共享的 ClientSession"""
+    global _SESSION
+    if _SESSION is not None:
+        await _SESSION.close()
+        _SESSION = None
+
+
+async def _run_with_session(coro):
+    """运行示例，结束后关闭共享会话"""
+    try:
+        await coro
+    finally:
+        await _close_session()
+
+
+def _data_value(line: bytes) -> bytes:
+    """取出 data 行的值，按 SSE 规范只去掉冒号后的一个空格"""
+    value = line[_DATA_PREFIX_LEN:]
+    return value[1:] if value.startswith(b" ") else value
+
+
+async def iter_sse_events(response) -> AsyncGenerator[Any, None]:
+    """
+    按事件解析 SSE 响应
+
+    以字节缓冲累积数据，按空行切分出完整事件，只解码 data 行的内容；
+    心跳注释和空行不会产生任何字符串对象。
+    """
+    buffer = bytearray()
+    async for chunk in response.content.iter_chunked(4096):
+        buffer += chunk
+        while True:
+            end = buffer.find(b"\n\n")
+            if end < 0:
+                break
+            frame = bytes(buffer[:end])
+            del buffer[:end + 2]
+
+            # 常见的单行 data 事件：跳过前缀直接解析 memoryview，JSON 允许开头的空格
+            if frame.startswith(_DATA_PREFIX) and b"\n" not in frame:
+                yield orjson.loads(memoryview(frame)[_DATA_PREFIX_LEN:])
+                continue
+
+            data_lines = [
+                _data_value(line)
+                for line in frame.split(b"\n")
+                if line.startswith(_DATA_PREFIX)
+            ]
+            if data_lines:
+                yield orjson.loads(b"\n".join(data_lines))
+
+
+class SlowClientError(Exception):
+    """事件消费过慢，事件队列在超时时间内一直处于满状态"""
+    pass
 
 
 class MCPClient:
     """MCP SSE 客户端"""
 
-    def __init__(self, server_url: str = "http://localhost:8000/mcp-sse"):
+    def __init__(
+        self,
+        server_url: str = "http://localhost:8000/mcp-sse",
+        max_queue_size: int = 1000,
+        queue_timeout: float = 5.0,
+        session: Optional[aiohttp.ClientSession] = None,
+        use_sse: bool = True,
+    ):
         self.server_url = server_url
-        self.session = None
-        self.event_queue = asyncio.Queue()
-        self.connected = False
-
-    async def connect(self):
-        """连接到 SSE 服务器"""
+        # 关闭 SSE 时只保留一个 WebSocket 连接，事件和 RPC 响应由同一个读取任务分发
+        self.use_sse = use_sse
+        # 未传入会话时在 connect() 中自行创建，并在 disconnect() 中关闭
+        self.session = session
+        self._own_session = session is None
+        # 有界队列：消费者跟不上时阻塞读取，由 TCP 窗口向服务器施加背压
+        self.event_queue = asyncio.Queue(maxsize=max_queue_size)
+        self.queue_timeout = queue_timeout
+        self._slow = False
+        self.slow_events = 0
+        # 所有 RPC 共用一个 WebSocket 连接，响应按 JSON-RPC id 分发给等待者
+        self.ws_url = "ws://localhost:8000/ws"
+        self._ws = None
+        self._sse_response = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        # 待发送的请求，由 _send_loop 把排队中的请求合并成一个批量帧
+        self._send_q: asyncio.Queue = asyncio.Queue()
+        # run() 的任务组，SSE 读取、WebSocket 读写和事件消费一起启动、一起取消
+        self._task_group: Optional[anyio.abc.TaskGroup] = None
+
+    @property
+    def connected(self) -> bool:
+        """WebSocket 连接是否可用"""
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self) -> bool:
+        """
+        连接到 SSE 服务器并建立 WebSocket 连接
+
+        Returns:
+            bool: 是否连接成功，成功后调用 run() 开始收发消息
+        """
         try:
-            self.session = aiohttp.ClientSession()
-
-            # 建立 SSE 连接
-            async with self.session.get(self.server_url) as response:
-                if response.status == 200:
-                    self.connected = True
-                    print("✅ 成功连接到 MCP SSE 服务器")
-
-                    # 监听事件流
-                    async for line in response.content:
-                        line = line.decode('utf-8').strip()
-                        if line.startswith("data: "):
-                            data = json.loads(line[6:])
-                            await self.event_queue.put(data)
-                else:
+            if self.session is None:
+                self.session = aiohttp.ClientSession()
+
+            # 建立 SSE 连接，事件流由 run() 中的 _read_sse 读取
+            if self.use_sse:
+                response = await self.session.get(self.server_url)
+                if response.status != 200:
                     print(f"❌ 连接失败: HTTP {response.status}")
-                    self.connected = False
+                    response.release()
+                    return False
+                self._sse_response = response
+                print("✅ 成功连接到 MCP SSE 服务器")
+
+            self._ws = await self.session.ws_connect(self.ws_url)
+            return True
 
         except Exception as e:
             print(f"❌ 连接错误: {e}")
-            self.connected = False
+            return False
+
+    async def run(self):
+        """在同一个任务组中运行所有读写任务，直到 disconnect() 或事件流结束"""
+        try:
+            async with anyio.create_task_group() as tg:
+                self._task_group = tg
+                if self.use_sse:
+                    tg.start_soon(self._read_sse)
+                tg.start_soon(self._read_ws)
+                tg.start_soon(self._send_loop)
+                tg.start_soon(self.listen_events)
+        finally:
+            self._task_group = None
+
+    async def _put_event(self, event: Any):
+        """放入事件队列，队列在超时时间内一直是满的则抛出 SlowClientError"""
+        try:
+            await asyncio.wait_for(
+                self.event_queue.put(event), timeout=self.queue_timeout
+            )
+        except asyncio.TimeoutError:
+            self._slow = True
+            self.slow_events += 1
+            raise SlowClientError(
+                f"事件队列已满超过 {self.queue_timeout} 秒"
+            )
+
+    async def _read_sse(self):
+        """读取 SSE 事件流放入事件队列，事件流结束或消费过慢时取消整个任务组"""
+        try:
+            async for data in iter_sse_events(self._sse_response):
+                await self._put_event(data)
+        except SlowClientError as e:
+            print(f"🐢 消费过慢，断开连接: {e} (累计 {self.slow_events} 次)")
+        except aiohttp.ClientError as e:
+            print(f"❌ 事件流错误: {e}")
+        self._task_group.cancel_scope.cancel()
+
+    async def _read_ws(self):
+        """
+        读取 WebSocket 消息并分发
+
+        RPC 响应按 id 唤醒对应的请求；服务器主动推送的消息（带 method 的文本帧，
+        或以 SSE 格式广播的二进制帧）放入事件队列。连接关闭时取消整个任务组。
+        """
+        try:
+            async for msg in self._ws:
+                if msg.type == aiohttp.WSMsgType.BINARY:
+                    if msg.data.startswith(_DATA_PREFIX):
+                        await self._put_event(orjson.loads(memoryview(msg.data)[_DATA_PREFIX_LEN:]))
+                    continue
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+
+                data = orjson.loads(msg.data)
+                # 批量请求的响应是数组，逐个分发
+                for item in data if isinstance(data, list) else (data,):
+                    future = self._pending.pop(item.get("id"), None)
+                    if future is not None:
+                        if not future.done():
+                            future.set_result(item)
+                    elif "method" in item:
+                        await self._put_event(item)
+        except SlowClientError as e:
+            print(f"🐢 消费过慢，断开连接: {e} (累计 {self.slow_events} 次)")
+        finally:
+            # 连接关闭后让所有未完成的请求失败，而不是永远等待
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("WebSocket 连接已关闭"))
+            self._pending.clear()
+            if self._task_group is not None:
+                self._task_group.cancel_scope.cancel()
+
+    async def _send_loop(self):
+        """取出一个请求后，把此刻已排队的请求一起作为 JSON-RPC 批量帧发送"""
+        while True:
+            batch = [await self._send_q.get()]
+            while len(batch) < _MAX_BATCH and not self._send_q.empty():
+                batch.append(self._send_q.get_nowait())
+
+            if len(batch) == 1:
+                payload = batch[0][1]
+            else:
+                payload = b"[" + b",".join(body for _, body in batch) + b"]"
+
+            try:
+                await self._ws.send_frame(payload, aiohttp.WSMsgType.TEXT)
+            except Exception as e:
+                for request_id, _ in batch:
+                    future = self._pending.pop(request_id, None)
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+
+    async def _request(self, body: bytes) -> Dict[str, Any]:
+        """
+        提交请求到发送队列并等待对应 id 的响应
+
+        Args:
+            body: 已编码、缺少 id 字段和结尾 "}" 的请求对象
+        """
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._send_q.put_nowait((request_id, body + b',"id":%d}' % request_id))
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
 
     async def disconnect(self):
         """断开连接"""
-        self.connected = False
-        if self.session:
+        if self._task_group is not None:
+            self._task_group.cancel_scope.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+        if self._sse_response is not None:
+            self._sse_response.close()
+            self._sse_response = None
+        # 唤醒并结束 listen_events，队列已满时丢弃最旧的事件腾出位置
+        if self.event_queue.full():
+            self.event_queue.get_nowait()
+        self.event_queue.put_nowait(_SENTINEL)
+        if self.session and self._own_session:
             await self.session.close()
             self.session = None
         print("🔌 已断开连接")
 
     async def listen_events(self):
         """监听服务器事件"""
-        while self.connected:
+        while True:
+            event = await self.event_queue.get()
+            if event is _SENTINEL:
+                break
+
             try:
-                event = await asyncio.wait_for(self.event_queue.get(), timeout=1.0)
-                print(f"📥 收到事件: {event.get('method', 'unknown')}")
+                print(f"📥 收到事件: {event.get('method') or event.get('type', 'unknown')}")
 
                 # 处理不同类型的事件
                 if event.get("method") == "server/info":
@@ -66,8 +309,6 @@ class MCPClient:
                     status = event['params']
                     print(f"📊 服务器状态: {status['status']}, 活跃连接: {status['active_connections']}")
 
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 print(f"❌ 处理事件错误: {e}")
 
@@ -77,29 +318,20 @@ class MCPClient:
             print("❌ 未连接到服务器")
             return None
 
-        tool_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": arguments or {}
-            }
-        }
+        tool_request = (
+            _TOOLS_CALL_PREFIX + orjson.dumps(tool_name)
+            + _TOOLS_CALL_ARGUMENTS + (orjson.dumps(arguments) if arguments else _EMPTY_OBJECT)
+            + b"}"
+        )
 
         print(f"🔧 调用工具: {tool_name}")
         print(f"📦 参数: {arguments}")
 
-        # 通过 WebSocket 发送请求
-        ws_url = "ws://localhost:8000/ws"
-        async with self.session.ws_connect(ws_url) as ws:
-            await ws.send_json(tool_request)
-
-            # 等待响应
-            response = await ws.receive_json()
-            print(f"📤 收到响应: {response}")
+        # 通过共享的 WebSocket 发送请求并等待响应
+        response = await self._request(tool_request)
+        print(f"📤 收到响应: {response}")
 
-            return response
+        return response
 
     async def list_tools(self):
         """获取工具列表"""
@@ -107,62 +339,59 @@ class MCPClient:
             print("❌ 未连接到服务器")
             return None
 
-        request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/list"
-        }
+        response = await self._request(_TOOLS_LIST_BODY)
 
-        ws_url = "ws://localhost:8000/ws"
-        async with self.session.ws_connect(ws_url) as ws:
-            await ws.send_json(request)
-            response = await ws.receive_json()
+        tools = response.get("result", {}).get("tools", [])
+        print(f"🛠️ 可用工具 ({len(tools)} 个):")
+        for tool in tools:
+            print(f"  - {tool['name']}: {tool['description']}")
 
-            tools = response.get("result", {}).get("tools", [])
-            print(f"🛠️ 可用工具 ({len(tools)} 个):")
-            for tool in tools:
-                print(f"  - {tool['name']}: {tool['description']}")
+        return response
 
-            return response
 
+async def main(use_sse: bool = True):
+    """
+    主函数
 
-async def main():
-    """主函数"""
-    client = MCPClient()
+    Args:
+        use_sse: 是否同时建立 SSE 事件流，为 False 时只使用 WebSocket
+    """
+    client = MCPClient(session=_get_session(), use_sse=use_sse)
 
-    try:
-        # 连接服务器
-        await client.connect()
+    # 连接服务器
+    if not await client.connect():
+        return
 
-        # 启动事件监听
-        listen_task = asyncio.create_task(client.listen_events())
+    async with anyio.create_task_group() as tg:
+        # 在后台接收事件和响应
+        tg.start_soon(client.run)
 
-        # 获取工具列表
-        print("\n" + "="*50)
-        print("获取可用工具列表...")
-        await client.list_tools()
+        try:
+            # 获取工具列表
+            print("\n" + "="*50)
+            print("获取可用工具列表...")
+            await client.list_tools()
 
-        # 演示工具调用
-        print("\n" + "="*50)
-        print("演示工具调用...")
+            # 演示工具调用
+            print("\n" + "="*50)
+            print("演示工具调用...")
 
-        # 导航示例
-        await client.call_tool("navigate_to_url", {
-            "url": "https://example.com"
-        })
+            # 导航示例
+            await client.call_tool("navigate_to_url", {
+                "url": "https://example.com"
+            })
 
-        # 获取页面内容示例
-        await client.call_tool("get_page_content", {})
+            # 获取页面内容示例
+            await client.call_tool("get_page_content", {})
 
-        # 等待一段时间观察服务器状态
-        print("\n" + "="*50)
-        print("等待 10 秒观察服务器状态...")
-        await asyncio.sleep(10)
+            # 等待一段时间观察服务器状态
+            print("\n" + "="*50)
+            print("等待 10 秒观察服务器状态...")
+            await asyncio.sleep(10)
 
-    finally:
-        # 清理
-        listen_task.cancel()
-        await client.disconnect()
+        finally:
+            # 清理，同时取消 run() 中的所有任务
+            await client.disconnect()
 
 
 async def simple_sse_example():
@@ -171,7 +400,7 @@ async def simple_sse_example():
     print("简单 SSE 连接示例")
     print("="*50)
 
-    session = aiohttp.ClientSession()
+    session = _get_session()
 
     try:
         # 建立 SSE 连接
@@ -180,21 +409,16 @@ async def simple_sse_example():
 
             # 读取事件流
             event_count = 0
-            async for line in response.content:
-                line = line.decode('utf-8').strip()
-                if line.startswith("data: "):
-                    data = json.loads(line[6:])
-                    print(f"事件 #{event_count + 1}: {data}")
-                    event_count += 1
+            async for data in iter_sse_events(response):
+                print(f"事件 #{event_count + 1}: {data}")
+                event_count += 1
 
-                    # 只接收前 3 个事件
-                    if event_count >= 3:
-                        break
+                # 只接收前 3 个事件
+                if event_count >= 3:
+                    break
 
     except Exception as e:
         print(f"错误: {e}")
-    finally:
-        await session.close()
 
 
 if __name__ == "__main__":
@@ -202,7 +426,10 @@ if __name__ == "__main__":
 
     if len(sys.argv) > 1 and sys.argv[1] == "simple":
         # 运行简单示例
-        asyncio.run(simple_sse_example())
+        asyncio.run(_run_with_session(simple_sse_example()))
+    elif len(sys.argv) > 1 and sys.argv[1] == "ws":
+        # 只使用 WebSocket 运行完整示例
+        asyncio.run(_run_with_session(main(use_sse=False)))
     else:
         # 运行完整示例
-        asyncio.run(main())
\ No newline at end of file
+        asyncio.run(_run_with_session(main()))
\ No newline at end of file